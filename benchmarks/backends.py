@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+"""
+Evaluator backend benchmark, recursive numeric code.
+
+Run from the repository root:
+$ python -m benchmarks.backends
+"""
+import argparse
+import sys
+import timeit
+from schemepy.evalapply import compiler, evaluate, machine
+from schemepy.frontend import inout
+from schemepy import globalenvironment
+
+
+BACKENDS = {
+    'tree': lambda exp: exp,
+    'closure': compiler.compile,
+    'machine': machine.compile,
+    }
+
+PROGRAMS = {
+    'fib': ("(define (fib n) (if (< n 2) n (+ (fib (- n 1)) (fib (- n 2)))))",
+            "(fib 15)"),
+    'factorial': ("(define (factorial n) (if (= n 1) n (* n (factorial (- n 1)))))",
+                  "(factorial 100)"),
+    'tak': ("(define (tak x y z) (if (< y x) (tak (tak (- x 1) y z) (tak (- y 1) z x) "
+            "(tak (- z 1) x y)) z))",
+            "(tak 12 8 4)"),
+    }
+
+
+def prepare(program, backend):
+    """
+    Defines the procedures of a program and returns its compiled call.
+    """
+    definition, call = program
+    env = globalenvironment.create()
+    reader = inout.read(iter([definition, call]))
+    evaluate.force_evaluate(backend(reader()), env)
+    return backend(reader()), env
+
+
+def main():
+    """
+    Benchmark entry point.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", help="number of timed runs (default: 5)", type=int, default=5)
+    args = parser.parse_args()
+    sys.setrecursionlimit(10000)
+    print("{:<12}{:>12}{:>12}{:>12}{:>10}".format("program", "tree", "closure", "machine",
+                                                  "speedup"))
+    for name, program in sorted(PROGRAMS.items()):
+        times = {}
+        for backend_name, backend in BACKENDS.items():
+            exp, env = prepare(program, backend)
+            times[backend_name] = min(timeit.repeat(lambda: evaluate.force_evaluate(exp, env),
+                                                    number=1, repeat=args.repeat))
+        print("{:<12}{:>11.4f}s{:>11.4f}s{:>11.4f}s{:>9.2f}x".format(
+            name, times['tree'], times['closure'], times['machine'],
+            times['tree'] / times['closure']))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+"""
+Parallel benchmark, parallel-map scaling with the number of worker processes.
+
+Run from the repository root:
+$ python -m benchmarks.parallel
+"""
+import argparse
+import os
+import timeit
+from schemepy.evalapply import compiler
+from schemepy import Interpreter
+
+
+PROGRAM = "(define (fib n) (if (< n 2) n (+ (fib (- n 1)) (fib (- n 2)))))"
+WORKLOAD = "(parallel-map fib (list {}))"
+
+
+def main():
+    """
+    Benchmark entry point.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", help="number of list elements (default: 64)", type=int,
+                        default=64)
+    parser.add_argument("--n", help="fib argument of each element (default: 15)", type=int,
+                        default=15)
+    parser.add_argument("--repeat", help="number of timed runs (default: 3)", type=int, default=3)
+    parser.add_argument("--max-processes", help="largest number of processes (default: cores)",
+                        type=int, default=os.cpu_count())
+    args = parser.parse_args()
+    workload = WORKLOAD.format(" ".join([str(args.n)] * args.size))
+    counts = sorted({2 ** i for i in range(args.max_processes.bit_length())}
+                    | {args.max_processes})
+    print("{:<12}{:>12}{:>10}{:>14}".format("processes", "time", "speedup", "elements/s"))
+    base_time = None
+    for count in counts:
+        with Interpreter(backend=compiler.compile, processes=count) as interpreter:
+            interpreter.eval_string(PROGRAM)
+            interpreter.eval_string(workload)  # Starts and warms the workers.
+            time = min(timeit.repeat(lambda: interpreter.eval_string(workload), number=1,
+                                     repeat=args.repeat))
+        base_time = base_time or time
+        print("{:<12}{:>11.4f}s{:>9.2f}x{:>14.0f}".format(count, time, base_time / time,
+                                                         args.size / time))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+"""
+Parser benchmark, tokenizer and analyzer throughput on a large generated source.
+
+Run from the repository root:
+$ python -m benchmarks.parse
+"""
+import argparse
+import timeit
+from schemepy.frontend import addresser, analyzer, tokenizer
+
+
+DEFINITION = """; Procedure {0}
+(define (proc-{0} n (acc l) (memo m))
+    (define limit {0})
+    (cond ((= n 0) acc)
+          ((< n limit) (proc-{0} (- n 1) (+ acc (* n 2.5)) memo))
+          (else (begin (display "large {0}")
+                       (apply + (list n 1+2i '(a b (c . d))))))))
+"""
+
+
+def generate(size):
+    """
+    Generates a source with size procedure definitions, one line per chunk.
+    """
+    return "".join(DEFINITION.format(i) for i in range(size)).splitlines(keepends=True)
+
+
+def tokenize_all(chunks, size):
+    """
+    Tokenizes all expressions of the source.
+    """
+    token = tokenizer.Tokenizer(iter(chunks))
+    return [token.tokenize() for _ in range(size)]
+
+
+def main():
+    """
+    Benchmark entry point.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", help="number of definitions (default: 5000)", type=int,
+                        default=5000)
+    parser.add_argument("--repeat", help="number of timed runs (default: 5)", type=int, default=5)
+    args = parser.parse_args()
+    chunks = generate(args.size)
+    megabytes = sum(len(c) for c in chunks) / 1e6
+    tokens = tokenize_all(chunks, args.size)
+    stages = [
+        ("tokenize", lambda: tokenize_all(chunks, args.size)),
+        ("analyze", lambda: [analyzer.analyze(t) for t in tokens]),
+        ("address", lambda: [addresser.address(analyzer.analyze(t)) for t in tokens]),
+        ]
+    print("{:.2f} MB, {} expressions".format(megabytes, args.size))
+    print("{:<10}{:>10}{:>12}{:>16}".format("stage", "time", "MB/s", "expressions/s"))
+    for name, stage in stages:
+        time = min(timeit.repeat(stage, number=1, repeat=args.repeat))
+        print("{:<10}{:>9.3f}s{:>12.2f}{:>16.0f}".format(name, time, megabytes / time,
+                                                        args.size / time))
+
+
+if __name__ == "__main__":
+    main()
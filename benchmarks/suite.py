@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+"""
+Benchmark suite, the hot paths of the interpreter on each backend.
+
+Each workload is timed as operations per second, an operation is one
+evaluation of its call, and the peak memory allocated by one operation is
+measured with tracemalloc. The results can be written as JSON and compared
+with the results of another revision, the exit status is 1 if a workload is
+slower than the baseline by more than the tolerance.
+
+Run from the repository root:
+$ python -m benchmarks.suite --json results.json
+$ python -m benchmarks.suite --compare results.json
+"""
+import argparse
+import json
+import platform
+import sys
+import timeit
+import tracemalloc
+from benchmarks import backends, parse
+from schemepy.evalapply import evaluate
+from schemepy.frontend import addresser, analyzer
+import schemepy
+
+
+LISTS = """
+(define (build n acc) (if (= n 0) acc (build (- n 1) (cons n acc))))
+(define (sum lst acc) (if (null? lst) acc (sum (cdr lst) (+ acc (car lst)))))
+"""
+
+STREAMS = """
+(define (s-cons (x {0}) (y {0})) (lambda ((f l)) (f x y)))
+(define (s-car (s l)) (s (lambda ((x l) (y l)) x)))
+(define (s-cdr (s l)) (s (lambda ((x l) (y l)) y)))
+(define (from n) (s-cons n (from (+ n 1))))
+(define (nth s n) (if (= n 0) (s-car s) (nth (s-cdr s) (- n 1))))
+"""
+
+WORKLOADS = {
+    'fib': backends.PROGRAMS['fib'],
+    'factorial': backends.PROGRAMS['factorial'],
+    'tak': backends.PROGRAMS['tak'],
+    'tail-loop': ("(define (loop n acc) (if (= n 0) acc (loop (- n 1) (+ acc 1))))",
+                  "(loop 10000 0)"),
+    'mutual-tail': ("(define (even? n) (if (= n 0) #t (odd? (- n 1))))"
+                    "(define (odd? n) (if (= n 0) #f (even? (- n 1))))",
+                    "(even? 10000)"),
+    'lists': (LISTS, "(sum (append (build 1000 '()) (build 1000 '())) 0)"),
+    'lazy-stream': (STREAMS.format('l'), "(nth (from 0) 500)"),
+    'memo-stream': (STREAMS.format('m'), "(nth (from 0) 500)"),
+    'eval': ("(define (use-eval n acc) (if (= n 0) acc "
+             "(use-eval (- n 1) (+ acc (eval '(* 2 3))))))",
+             "(use-eval 500 0)"),
+    'apply': ("(define (use-apply n acc) (if (= n 0) acc "
+              "(use-apply (- n 1) (apply + (list acc n)))))",
+              "(use-apply 2000 0)"),
+    }
+
+PARSE_SIZE = 500
+
+
+def prepare(workload, backend):
+    """
+    Evaluates the definitions of a workload, returns its operation.
+    """
+    definitions, call = workload
+    session = schemepy.Interpreter(backend=backend)
+    session.eval_string(definitions)
+    exp = backend(session.parse(call)[0])
+    env = session.environment
+    return lambda: evaluate.force_evaluate(exp, env)
+
+
+def prepare_parse():
+    """
+    Creates the parser operation, tokenizes, analyzes and addresses a
+    generated source.
+    """
+    chunks = parse.generate(PARSE_SIZE)
+    return lambda: [addresser.address(analyzer.analyze(t))
+                    for t in parse.tokenize_all(chunks, PARSE_SIZE)]
+
+
+def measure(operation, repeat):
+    """
+    Get the operations per second and the peak memory of one operation in
+    bytes.
+    """
+    timer = timeit.Timer(operation)
+    number, _ = timer.autorange()
+    seconds = min(timer.repeat(repeat=repeat, number=number)) / number
+    tracemalloc.start()
+    try:
+        operation()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return 1 / seconds, peak
+
+
+def compare(results, baseline, tolerance):
+    """
+    Get the ratio of each result to the baseline and the names of the
+    regressions.
+    """
+    ratios, regressions = {}, []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base:
+            ratios[name] = result['ops_per_sec'] / base['ops_per_sec']
+            if ratios[name] < 1 - tolerance:
+                regressions.append(name)
+    return ratios, regressions
+
+
+def main():
+    """
+    Benchmark entry point.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backend", help="backends to run (default: all)", action="append",
+                        choices=sorted(backends.BACKENDS))
+    parser.add_argument("--workload", help="workloads to run (default: all)", action="append",
+                        choices=sorted(WORKLOADS) + ['parse'])
+    parser.add_argument("--repeat", help="number of timed runs (default: 5)", type=int, default=5)
+    parser.add_argument("--json", help="write the results to a JSON file", metavar="FILE")
+    parser.add_argument("--compare", help="compare with the results in a JSON file",
+                        metavar="FILE")
+    parser.add_argument("--tolerance", help="allowed slowdown against --compare (default: 0.1)",
+                        type=float, default=0.1)
+    args = parser.parse_args()
+    sys.setrecursionlimit(10000)
+    names = args.workload or sorted(WORKLOADS) + ['parse']
+    operations = {}
+    for name in names:
+        if name == 'parse':
+            operations[name] = prepare_parse
+            continue
+        for backend in args.backend or sorted(backends.BACKENDS):
+            operations["{}/{}".format(name, backend)] = \
+                lambda w=WORKLOADS[name], b=backends.BACKENDS[backend]: prepare(w, b)
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as stream:
+            baseline = json.load(stream)['results']
+    print("{:<24}{:>14}{:>14}{:>10}".format("workload", "ops/s", "peak KB",
+                                            "vs base" if baseline else ""))
+    results = {}
+    for name, prepare_operation in operations.items():
+        ops_per_sec, peak = measure(prepare_operation(), args.repeat)
+        results[name] = {'ops_per_sec': ops_per_sec, 'peak_bytes': peak}
+        ratio = compare({name: results[name]}, baseline, args.tolerance)[0].get(name)
+        print("{:<24}{:>14.1f}{:>14.1f}{:>10}".format(
+            name, ops_per_sec, peak / 1024, "{:.2f}x".format(ratio) if ratio else ""))
+    if args.json:
+        with open(args.json, "w") as stream:
+            json.dump({'version': schemepy.__version__, 'python': platform.python_version(),
+                       'results': results}, stream, indent=2, sort_keys=True)
+    if baseline:
+        regressions = compare(results, baseline, args.tolerance)[1]
+        if regressions:
+            print("Regressions: {}".format(", ".join(regressions)))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
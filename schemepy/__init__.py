@@ -0,0 +1,6 @@
+"""
+Scheme interpreter.
+"""
+__version__ = '1.0.0'
+
+from schemepy.interpreter import Interpreter
@@ -5,7 +5,48 @@ Scheme interpreter.
 import argparse
 import logging
 import sys
-from schemepy import repl
+from schemepy.evalapply import compiler, machine
+from schemepy import parallel, profiler, repl, script, server, stats
+
+
+BACKENDS = {
+    'tree': None,
+    'closure': compiler.compile,
+    'machine': machine.compile,
+    }
+
+
+def _run(args, backend):
+    """
+    Runs the REPL, the server or the programs, returns the exit status.
+    """
+    if args.serve:
+        prelude = []
+        for path in args.program:
+            with open(path) as program:
+                prelude.append(program.read())
+        timeout = args.timeout if args.timeout is not None else server.TIMEOUT
+        server.serve(args.serve, prelude, backend, args.optimize, args.threads, args.fuel,
+                     timeout)
+    elif not args.program:
+        repl.repl(backend, args.optimize, args.jobs, args.fuel, args.timeout)
+    elif args.program == ["-"]:
+        return script.run(sys.stdin, backend, args.optimize, args.jobs, args.fuel, args.timeout)
+    elif len(args.program) == 1:
+        return script.run_file(args.program[0], backend, args.optimize, not args.no_cache,
+                               args.jobs, args.fuel, args.timeout)
+    elif args.jobs > 1:
+        status = 0
+        for file_status, output in parallel.run_files(args.program, args.jobs, backend,
+                                                      args.optimize, not args.no_cache,
+                                                      args.fuel, args.timeout):
+            sys.stdout.write(output)
+            status = max(status, file_status)
+        return status
+    else:
+        return max(script.run_file(path, backend, args.optimize, not args.no_cache,
+                                   fuel=args.fuel, timeout=args.timeout)
+                   for path in args.program)
 
 
 def main():
@@ -13,11 +54,57 @@ def main():
     Program entry point.
     """
     parser = argparse.ArgumentParser()
+    parser.add_argument("program", nargs="*",
+                        help="program files to run, each in its own session, - reads a program "
+                             "from stdin (default: start a REPL)")
     parser.add_argument("--verbose", help="increase output verbosity", action="store_true")
+    parser.add_argument("--backend", help="evaluator backend (default: tree)",
+                        choices=sorted(BACKENDS), default='tree')
+    parser.add_argument("--optimize", help="fold constants and remove dead code before evaluating",
+                        action="store_true")
+    parser.add_argument("--no-cache", help="do not read or write the parsed program cache",
+                        action="store_true")
+    parser.add_argument("--jobs", help="number of worker processes for the program files or for "
+                                       "parallel-map (default: 1)", type=int, default=1)
+    parser.add_argument("--serve", help="serve sessions on ADDRESS, host:port or a Unix socket "
+                                        "path, the program files are the prelude, one input "
+                                        "is evaluated at a time",
+                        metavar="ADDRESS")
+    parser.add_argument("--threads", help="number of server worker threads (default: automatic)",
+                        type=int)
+    parser.add_argument("--profile", help="profile the Scheme procedures, print a table and write "
+                                          "the collapsed call stacks to STACKS",
+                        metavar="STACKS")
+    parser.add_argument("--stats", help="count the evaluation events, (runtime-stats) returns the "
+                                        "counts", action="store_true")
+    parser.add_argument("--fuel", help="maximum number of evaluation steps of each expression",
+                        type=int)
+    parser.add_argument("--timeout", help="maximum number of seconds of each expression "
+                                          "(default: unlimited, {} with --serve)"
+                                          .format(server.TIMEOUT), type=float)
     args = parser.parse_args()
+    if "-" in args.program and (len(args.program) > 1 or args.serve):
+        parser.error("- can not be combined with program files or --serve")
+    if args.profile and (args.serve or len(args.program) > 1 and args.jobs > 1):
+        parser.error("--profile can not be combined with --serve or program files on --jobs")
+    if args.profile and args.backend == 'machine':
+        parser.error("--profile can not be combined with the machine backend")
     logging_level = logging.DEBUG if args.verbose else logging.INFO
     logging.basicConfig(stream=sys.stdout, level=logging_level)
-    repl.repl()
+    backend = BACKENDS[args.backend]
+    if args.stats:
+        stats.enable()
+    profile = profiler.Profiler() if args.profile else None
+    if profile:
+        profile.enable()
+    try:
+        status = _run(args, backend)
+    finally:
+        if profile:
+            profile.disable()
+            profile.report()
+            profile.write_stacks(args.profile)
+    sys.exit(status)
 
 
 if __name__ == "__main__":
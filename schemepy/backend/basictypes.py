@@ -1,154 +1,199 @@
 """
 The basic types of the language.
-"""
-import abc
-
 
-class BasicType(metaclass=abc.ABCMeta):
+The basic types are compact, they have no instance dictionary and the value is
+a plain attribute. There is only one instance of each boolean and the small
+integers are shared.
+"""
+class BasicType:
     """"
-    Basic type abstract base class.
+    Basic type base class.
+
+    Subclasses store the value of the type in the value attribute.
     """
-    @abc.abstractproperty
-    def value(self):
-        """"
-        Get the value of the type.
-        """
-        pass
+    __slots__ = ()
 
 
 class Boolean(BasicType):
     """"
     Boolean basic type.
     """
-    def __init__(self, value):
+    __slots__ = ('value',)
+
+    def __new__(cls, value):
         assert isinstance(value, bool)
-        self.__value = value
+        return TRUE if value else FALSE
+
+    def __reduce__(self):
+        return Boolean, (self.value,)
 
     def __str__(self):
-        return "<Boolean {}>".format(self.__value)
+        return "<Boolean {}>".format(self.value)
+
+
+def _boolean(value):
+    """
+    Creates a boolean instance.
+    """
+    boolean = object.__new__(Boolean)
+    boolean.value = value
+    return boolean
 
-    @property
-    def value(self):
-        return self.__value
+
+TRUE = _boolean(True)
+FALSE = _boolean(False)
 
 
 class Integer(BasicType):
     """"
     Integer basic type.
     """
+    __slots__ = ('value',)
+
     def __init__(self, value):
         assert isinstance(value, int)
-        self.__value = value
+        self.value = value
 
     def __str__(self):
-        return "<Integer {}>".format(self.__value)
+        return "<Integer {}>".format(self.value)
 
-    @property
-    def value(self):
-        return self.__value
+
+_SMALL_INTEGER_MIN = -128
+_SMALL_INTEGER_MAX = 1023
+_SMALL_INTEGERS = [Integer(i) for i in range(_SMALL_INTEGER_MIN, _SMALL_INTEGER_MAX + 1)]
+
+
+def integer(value):
+    """
+    Get an integer basic type, small integers are shared.
+    """
+    if _SMALL_INTEGER_MIN <= value <= _SMALL_INTEGER_MAX:
+        return _SMALL_INTEGERS[value - _SMALL_INTEGER_MIN]
+    return Integer(value)
 
 
 class Float(BasicType):
     """"
     Float basic type.
     """
+    __slots__ = ('value',)
+
     def __init__(self, value):
         assert isinstance(value, float)
-        self.__value = value
+        self.value = value
 
     def __str__(self):
-        return "<Float {}>".format(self.__value)
-
-    @property
-    def value(self):
-        return self.__value
+        return "<Float {}>".format(self.value)
 
 
 class Complex(BasicType):
     """"
     Complex basic type.
     """
+    __slots__ = ('value',)
+
     def __init__(self, value):
         assert isinstance(value, complex)
-        self.__value = value
+        self.value = value
 
     def __str__(self):
-        return "<Complex {}>".format(self.__value)
-
-    @property
-    def value(self):
-        return self.__value
+        return "<Complex {}>".format(self.value)
 
 
 class Symbol(BasicType):
     """"
     Symbol basic type.
     """
+    __slots__ = ('value',)
+
     def __init__(self, value):
         assert isinstance(value, str)
-        self.__value = value
+        self.value = value
 
     def __str__(self):
-        return "<Symbol {}>".format(self.__value)
-
-    @property
-    def value(self):
-        return self.__value
+        return "<Symbol {}>".format(self.value)
 
 
 class String(BasicType):
     """"
     String basic type.
     """
+    __slots__ = ('value',)
+
     def __init__(self, value):
         assert isinstance(value, str)
-        self.__value = value
+        self.value = value
 
     def __str__(self):
-        return "<String {}>".format(self.__value)
-
-    @property
-    def value(self):
-        return self.__value
+        return "<String {}>".format(self.value)
 
 
 class Pair(BasicType):
     """"
     Pair basic type.
     """
+    __slots__ = ('car', 'cdr')
+
     def __init__(self, car, cdr):
-        self.__car = car
-        self.__cdr = cdr
+        self.car = car
+        self.cdr = cdr
 
     def __str__(self):
-        return "<Pair {} {}>".format(self.__car, self.__cdr)
+        return "<Pair {} {}>".format(self.car, self.cdr)
 
     @property
     def value(self):
-        return [self.__car, self.__cdr]
-
-    @property
-    def car(self):
-        """
-        Get first value.
-        """
-        return self.__car
-
-    @property
-    def cdr(self):
         """
-        Get second value.
+        Get the value of the type.
         """
-        return self.__cdr
+        return [self.car, self.cdr]
 
 
-class List(BasicType, list):
+class List(BasicType):
     """"
     List basic type.
+
+    A list is a chain of cons cells ending with the empty list, NULL. The tail
+    of a list is shared, not copied, so cons, car and cdr are O(1).
     """
+    __slots__ = ('car', 'cdr')
+
+    def __init__(self, car, cdr):
+        assert isinstance(cdr, List)
+        self.car = car
+        self.cdr = cdr
+
+    def __reduce__(self):
+        return 'NULL' if self is NULL else (make_list, (self.value,))
+
+    def __bool__(self):
+        return self is not NULL
+
+    def __iter__(self):
+        lst = self
+        while lst is not NULL:
+            yield lst.car
+            lst = lst.cdr
+
     def __str__(self):
         return "<List {}>".format([str(e) for e in self])
 
     @property
     def value(self):
-        return self
+        """
+        Get the value of the type, the elements in a Python list.
+        """
+        return list(self)
+
+
+NULL = object.__new__(List)
+
+
+def make_list(values, tail=NULL):
+    """
+    Creates a list of the values in a Python sequence followed by tail.
+    """
+    lst = tail
+    for value in reversed(values):
+        lst = List(value, lst)
+    return lst
@@ -28,6 +28,13 @@ class SelfEvaluating(Expression):
     def __str__(self):
         return "<SelfEvaluating {}>".format(self.__value)
 
+    @property
+    def value(self):
+        """
+        Get the value.
+        """
+        return self.__value
+
     def evaluate(self, env):
         return self.__value
 
@@ -42,10 +49,90 @@ class Identifier(Expression):
     def __str__(self):
         return "<Identifier {}>".format(self.__identifier)
 
+    @property
+    def identifier(self):
+        """
+        Get the identifier.
+        """
+        return self.__identifier
+
     def evaluate(self, env):
         return env[self.__identifier]
 
 
+class LocalIdentifier(Expression):
+    """"
+    Identifier expression bound in a compound procedure frame.
+
+    The identifier is resolved to a lexical address, the number of frames to
+    walk out and the slot in that frame.
+    """
+    def __init__(self, identifier, depth, slot):
+        self.__identifier = identifier
+        self.__depth = depth
+        self.__slot = slot
+
+    def __str__(self):
+        return "<LocalIdentifier {} {} {}>".format(self.__identifier, self.__depth, self.__slot)
+
+    @property
+    def identifier(self):
+        """
+        Get the identifier.
+        """
+        return self.__identifier
+
+    @property
+    def depth(self):
+        """
+        Get the number of frames to walk out.
+        """
+        return self.__depth
+
+    @property
+    def slot(self):
+        """
+        Get the slot in the frame.
+        """
+        return self.__slot
+
+    def evaluate(self, env):
+        return env.lookup(self.__depth, self.__slot)
+
+
+class GlobalIdentifier(Expression):
+    """"
+    Identifier expression bound in the global environment.
+
+    The value is cached with the version of the global frame it was looked up
+    in, it is looked up again when the version changes.
+    """
+    def __init__(self, identifier):
+        self.__identifier = identifier
+        self.__version = None
+        self.__value = None
+
+    def __reduce__(self):
+        return GlobalIdentifier, (self.__identifier,)
+
+    def __str__(self):
+        return "<GlobalIdentifier {}>".format(self.__identifier)
+
+    @property
+    def identifier(self):
+        """
+        Get the identifier.
+        """
+        return self.__identifier
+
+    def evaluate(self, env):
+        version = env.global_version
+        if version != self.__version:
+            self.__value = env.global_frame[self.__identifier]
+            self.__version = version
+        return self.__value
+
+
 class Quote(Expression):
     """"
     Quote expression.
@@ -56,6 +143,13 @@ class Quote(Expression):
     def __str__(self):
         return "<Quote {}>".format(self.__quotation)
 
+    @property
+    def quotation(self):
+        """
+        Get the quotation.
+        """
+        return self.__quotation
+
     def evaluate(self, env):
         return self.__quotation
 
@@ -71,8 +165,66 @@ class Definition(Expression):
     def __str__(self):
         return "<Definition {} {}>".format(self.__identifier, self.__value)
 
+    @property
+    def identifier(self):
+        """
+        Get the identifier.
+        """
+        return self.__identifier
+
+    @property
+    def value(self):
+        """
+        Get the value.
+        """
+        return self.__value
+
+    def evaluate(self, env):
+        value = evaluate.evaluate(self.__value, env)
+        if isinstance(value, procedures.Procedure):
+            value.name_as(self.__identifier)
+        env.update({self.__identifier: value})
+        return self.__identifier
+
+
+class LocalDefinition(Expression):
+    """"
+    Definition expression in a compound procedure frame.
+    """
+    def __init__(self, identifier, slot, value):
+        self.__identifier = identifier
+        self.__slot = slot
+        self.__value = value
+
+    def __str__(self):
+        return "<LocalDefinition {} {} {}>".format(self.__identifier, self.__slot, self.__value)
+
+    @property
+    def identifier(self):
+        """
+        Get the identifier.
+        """
+        return self.__identifier
+
+    @property
+    def slot(self):
+        """
+        Get the slot in the frame.
+        """
+        return self.__slot
+
+    @property
+    def value(self):
+        """
+        Get the value.
+        """
+        return self.__value
+
     def evaluate(self, env):
-        env.update({self.__identifier: evaluate.evaluate(self.__value, env)})
+        value = evaluate.evaluate(self.__value, env)
+        if isinstance(value, procedures.Procedure):
+            value.name_as(self.__identifier)
+        env.assign(0, self.__slot, value)
         return self.__identifier
 
 
@@ -87,11 +239,102 @@ class Assignment(Expression):
     def __str__(self):
         return "<Assignment {} {}>".format(self.__identifier, self.__value)
 
+    @property
+    def identifier(self):
+        """
+        Get the identifier.
+        """
+        return self.__identifier
+
+    @property
+    def value(self):
+        """
+        Get the value.
+        """
+        return self.__value
+
     def evaluate(self, env):
         env[self.__identifier] = evaluate.evaluate(self.__value, env)
         return self.__identifier
 
 
+class LocalAssignment(Expression):
+    """"
+    Assignment expression to an identifier bound in a compound procedure frame.
+    """
+    def __init__(self, identifier, depth, slot, value):
+        self.__identifier = identifier
+        self.__depth = depth
+        self.__slot = slot
+        self.__value = value
+
+    def __str__(self):
+        return "<LocalAssignment {} {} {} {}>".format(self.__identifier, self.__depth, self.__slot,
+                                                      self.__value)
+
+    @property
+    def identifier(self):
+        """
+        Get the identifier.
+        """
+        return self.__identifier
+
+    @property
+    def depth(self):
+        """
+        Get the number of frames to walk out.
+        """
+        return self.__depth
+
+    @property
+    def slot(self):
+        """
+        Get the slot in the frame.
+        """
+        return self.__slot
+
+    @property
+    def value(self):
+        """
+        Get the value.
+        """
+        return self.__value
+
+    def evaluate(self, env):
+        env.assign(self.__depth, self.__slot, evaluate.evaluate(self.__value, env))
+        return self.__identifier
+
+
+class GlobalAssignment(Expression):
+    """"
+    Assignment expression to an identifier bound in the global environment.
+    """
+    def __init__(self, identifier, value):
+        self.__identifier = identifier
+        self.__value = value
+
+    def __str__(self):
+        return "<GlobalAssignment {} {}>".format(self.__identifier, self.__value)
+
+    @property
+    def identifier(self):
+        """
+        Get the identifier.
+        """
+        return self.__identifier
+
+    @property
+    def value(self):
+        """
+        Get the value.
+        """
+        return self.__value
+
+    def evaluate(self, env):
+        env.global_frame[self.__identifier] = evaluate.evaluate(self.__value, env)
+        return self.__identifier
+
+
 class If(Expression):
     """"
     If expression.
@@ -104,29 +347,89 @@ class If(Expression):
     def __str__(self):
         return "<If {} {} {}>".format(self.__predicate, self.__consequent, self.__alternative)
 
+    @property
+    def predicate(self):
+        """
+        Get the predicate.
+        """
+        return self.__predicate
+
+    @property
+    def consequent(self):
+        """
+        Get the consequent.
+        """
+        return self.__consequent
+
+    @property
+    def alternative(self):
+        """
+        Get the alternative.
+        """
+        return self.__alternative
+
     def evaluate(self, env):
-        predicate = evaluate.force_evaluate(self.__predicate, env)
-        if not isinstance(predicate, basictypes.Boolean) or predicate.value:
+        if evaluate.force_evaluate(self.__predicate, env) is not basictypes.FALSE:
             continuation = self.__consequent
         else:
             continuation = self.__alternative
         return evaluate.tail_call_evaluate(continuation, env) if continuation else \
-            basictypes.Boolean(False)
+            basictypes.FALSE
 
 
 class Lambda(Expression):
     """"
     Lambda expression.
     """
-    def __init__(self, parameters, body):
+    def __init__(self, parameters, body, definitions=()):
         self.__parameters = parameters
-        self.__body = body  # TODO: Handle internal definitions?
+        self.__body = body
+        self.__definitions = definitions
+        self.__layout = Lambda.frame_layout(parameters, definitions)
 
     def __str__(self):
         return "<Lambda {} {{body}}>".format([str(p) for p in self.__parameters])
 
+    @property
+    def parameters(self):
+        """
+        Get the parameters.
+        """
+        return self.__parameters
+
+    @property
+    def body(self):
+        """
+        Get the body.
+        """
+        return self.__body
+
+    @property
+    def definitions(self):
+        """
+        Get the identifiers of the internal definitions.
+        """
+        return self.__definitions
+
+    @property
+    def layout(self):
+        """
+        Get the frame layout.
+        """
+        return self.__layout
+
+    @staticmethod
+    def frame_layout(parameters, definitions):
+        """
+        Creates a frame layout, parameters first and internal definitions last.
+        """
+        identifiers = [p.name for p in parameters]
+        identifiers += [d for d in definitions if d not in identifiers]
+        return {identifier: slot for slot, identifier in enumerate(identifiers)}
+
     def evaluate(self, env):
-        return procedures.Compound(self.__parameters, self.__body, env)
+        env.capture()
+        return procedures.Compound(self.__parameters, self.__body, env, self.__layout)
 
 
 class Begin(Expression):
@@ -139,6 +442,13 @@ class Begin(Expression):
     def __str__(self):
         return "<Begin {sequence}>"
 
+    @property
+    def sequence(self):
+        """
+        Get the sequence.
+        """
+        return self.__sequence
+
     def evaluate(self, env):
         return evaluate.evaluate_sequence(self.__sequence, env)
 
@@ -154,5 +464,96 @@ class Application(Expression):
     def __str__(self):
         return "<Application {} {}>".format(self.__operator, [str(o) for o in self.__operands])
 
+    @property
+    def operator(self):
+        """
+        Get the operator.
+        """
+        return self.__operator
+
+    @property
+    def operands(self):
+        """
+        Get the operands.
+        """
+        return self.__operands
+
     def evaluate(self, env):
         return apply.apply(evaluate.force_evaluate(self.__operator, env), self.__operands, env)
+
+
+class SelfApplication(Application):
+    """"
+    Application of a compound procedure to itself in tail position.
+
+    The operator is the identifier the procedure is defined with. If it is
+    still bound to the procedure whose frame the application is evaluated in,
+    the procedure is applied again in that frame, reusing it if it is not
+    captured. Otherwise it is an ordinary application.
+    """
+    def __str__(self):
+        return "<SelfApplication {} {}>".format(self.operator, [str(o) for o in self.operands])
+
+    def evaluate(self, env):
+        procedure = evaluate.force_evaluate(self.operator, env)
+        if type(procedure) is procedures.Compound and procedure.owns(env):
+            return procedure.reapply(self.operands, env)
+        return apply.apply(procedure, self.operands, env)
+
+
+class Guarded(Expression):
+    """"
+    Expression optimized for the values of global identifiers.
+
+    The bindings map the global identifiers to the values the expression was
+    optimized for. While they are still bound to them the optimized expression
+    is evaluated, else the original one. The bindings are checked again when
+    the version of the global frame changes.
+    """
+    def __init__(self, optimized, original, bindings):
+        self.__optimized = optimized
+        self.__original = original
+        self.__bindings = bindings
+        self.__version = None
+        self.__valid = False
+
+    def __str__(self):
+        return "<Guarded {} {}>".format(self.__optimized, self.__original)
+
+    @property
+    def optimized(self):
+        """
+        Get the optimized expression.
+        """
+        return self.__optimized
+
+    @property
+    def original(self):
+        """
+        Get the original expression.
+        """
+        return self.__original
+
+    @property
+    def bindings(self):
+        """
+        Get the bindings the expression was optimized for.
+        """
+        return self.__bindings
+
+    def valid(self, env):
+        """
+        Checks if the global identifiers are still bound to the values the
+        expression was optimized for.
+        """
+        version = env.global_version
+        if version != self.__version:
+            frame = env.global_frame
+            self.__valid = all(frame[identifier] is value
+                               for identifier, value in self.__bindings.items())
+            self.__version = version
+        return self.__valid
+
+    def evaluate(self, env):
+        return evaluate.tail_call_evaluate(self.__optimized if self.valid(env) else
+                                           self.__original, env)
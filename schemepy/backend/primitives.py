@@ -5,77 +5,109 @@ import functools
 import inspect
 import operator
 from schemepy.backend import procedures, basictypes
+from schemepy.evalapply import apply, budget, evaluate
+from schemepy import environment
 
 
-TRUE = basictypes.Boolean(True)
-FALSE = basictypes.Boolean(False)
-NULL = basictypes.List([])
+TRUE = basictypes.TRUE
+FALSE = basictypes.FALSE
+NULL = basictypes.NULL
 
 
 def _primitive(func):
     """
     Primitive function decorator.
+
+    The function takes the operands and optionally the environment, the
+    number of arguments is looked up once when the primitive is created.
     """
+    num_of_args = len(inspect.getfullargspec(func).args)
+    if num_of_args not in (1, 2):
+        raise TypeError("Primitive function not supported")
+
     def argument_checker(args, env):
         """
         Calls a primitive function with correct arguments.
+
+        The errors of the language, exhausted budgets and recursion errors are
+        raised as they are, other errors of the function are raised as an
+        ApplyError.
         """
-        try:  # TODO: Improve error handling
-            num_of_args = len(inspect.getargspec(func).args)
-            if num_of_args == 1:
-                return func(args)
-            elif num_of_args == 2:
-                return func(args, env)
-            else:
-                raise TypeError("Primitive function not supported")
-        except Exception:
-            print("Encountered an error when applying a primitive procedure.")
+        try:
+            return func(args) if num_of_args == 1 else func(args, env)
+        except (environment.EnvError, evaluate.EvalError, apply.ApplyError,
+                budget.ResourceExhausted, RecursionError):
+            raise
+        except Exception as error:
+            raise apply.ApplyError("Encountered an error when applying a primitive procedure: "
+                                   "{}".format(error)) from error
 
     return procedures.Primitive(argument_checker)
 
 
-def _converter(func):
+PURE = {}
+
+
+def _pure(func):
     """
-    Scheme<->Python decorator.
+    Pure primitive function decorator.
+
+    The function has no side effects and its result depends on the operands
+    only, so an application on constants can be computed in advance. The
+    primitive is mapped to the function in PURE, errors are not caught there.
     """
-    def scheme2python(operands):
-        """
-        Converts a Scheme operand list to a Python operand list.
-        """
-        return [o.value for o in operands]
+    primitive = _primitive(func)
+    PURE[primitive] = func
+    return primitive
 
-    def python2scheme(value):
-        """
-        Converts a Python value to a Scheme value.
-        """
-        if isinstance(value, bool):
-            return basictypes.Boolean(value)
-        elif isinstance(value, int):
-            return basictypes.Integer(value)
-        elif isinstance(value, float):
-            return basictypes.Float(value)
-        elif isinstance(value, complex):
-            return basictypes.Complex(value)
-        elif isinstance(value, str):
-            return basictypes.String(value)
-        else:
-            raise ValueError("Could not convert Python value to Scheme value")
-
-    def convert(operands, *args, **kwargs):
-        """
-        Scheme<->Python converter.
 
-        Converts the Scheme operands to Python operands, applies the function
-        and converts the result to a Scheme value.
-        """
-        operands = scheme2python(operands)
-        result = func(operands, *args, **kwargs)
-        return python2scheme(result)
-    return convert
+def _python2scheme(value):
+    """
+    Converts a Python number or boolean to a Scheme value.
 
+    Small integers and booleans are shared instead of allocated.
+    """
+    value_type = type(value)
+    if value_type is bool:
+        return TRUE if value else FALSE
+    elif value_type is int:
+        return basictypes.integer(value)
+    elif value_type is float:
+        return basictypes.Float(value)
+    elif value_type is complex:
+        return basictypes.Complex(value)
+    else:
+        raise ValueError("Could not convert Python value to Scheme number")
 
-@_primitive
-@_converter
+
+def _numeric(binary):
+    """
+    Scheme<->Python decorator for numeric functions.
+
+    Two operands, the common case, are handled by the binary function directly.
+    Any other number of operands are converted to a Python operand list and
+    handled by the decorated function.
+    """
+    def decorator(func):
+        """
+        Numeric function decorator.
+        """
+        def convert(operands):
+            """
+            Scheme<->Python converter.
+
+            Converts the Scheme operands to Python operands, applies the function
+            and converts the result to a Scheme value.
+            """
+            if len(operands) == 2:
+                return _python2scheme(binary(operands[0].value, operands[1].value))
+            return _python2scheme(func([o.value for o in operands]))
+        return convert
+    return decorator
+
+
+@_pure
+@_numeric(operator.add)
 def add(operands):
     """
     Addition primitive function.
@@ -83,8 +115,8 @@ def add(operands):
     return functools.reduce(operator.add, operands, 0)
 
 
-@_primitive
-@_converter
+@_pure
+@_numeric(operator.sub)
 def sub(operands):
     """
     Subtraction primitive function.
@@ -92,8 +124,8 @@ def sub(operands):
     return -operands[0] if len(operands) == 1 else functools.reduce(operator.sub, operands)
 
 
-@_primitive
-@_converter
+@_pure
+@_numeric(operator.mul)
 def mul(operands):
     """
     Multiplication primitive function.
@@ -101,8 +133,8 @@ def mul(operands):
     return functools.reduce(operator.mul, operands, 1)
 
 
-@_primitive
-@_converter
+@_pure
+@_numeric(operator.truediv)
 def div(operands):
     """
     Division primitive function.
@@ -117,8 +149,8 @@ def _cmp(operands, func):
     return all(func(operands[i], operands[i + 1]) for i in range(len(operands) - 1))
 
 
-@_primitive
-@_converter
+@_pure
+@_numeric(operator.lt)
 def less(operands):
     """
     < primitive function.
@@ -126,8 +158,8 @@ def less(operands):
     return _cmp(operands, operator.lt)
 
 
-@_primitive
-@_converter
+@_pure
+@_numeric(operator.le)
 def less_or_equal(operands):
     """
     <= primitive function.
@@ -135,8 +167,8 @@ def less_or_equal(operands):
     return _cmp(operands, operator.le)
 
 
-@_primitive
-@_converter
+@_pure
+@_numeric(operator.eq)
 def equal(operands):
     """
     = primitive function.
@@ -144,8 +176,8 @@ def equal(operands):
     return _cmp(operands, operator.eq)
 
 
-@_primitive
-@_converter
+@_pure
+@_numeric(operator.ne)
 def not_equal(operands):
     """
     =/= primitive function.
@@ -153,8 +185,8 @@ def not_equal(operands):
     return _cmp(operands, operator.ne)
 
 
-@_primitive
-@_converter
+@_pure
+@_numeric(operator.ge)
 def greater_or_equal(operands):
     """
     >= primitive function.
@@ -162,8 +194,8 @@ def greater_or_equal(operands):
     return _cmp(operands, operator.ge)
 
 
-@_primitive
-@_converter
+@_pure
+@_numeric(operator.gt)
 def greater(operands):
     """
     > primitive function.
@@ -176,7 +208,7 @@ def is_null(args):
     """
     Checks if the argument is null.
     """
-    return basictypes.Boolean(isinstance(args[0], basictypes.List) and len(args[0].value) == 0)
+    return TRUE if args[0] is NULL else FALSE
 
 
 @_primitive
@@ -187,7 +219,7 @@ def cons(args):
     cons pair.
     """
     if isinstance(args[1], basictypes.List):
-        return basictypes.List([args[0]] + args[1])
+        return basictypes.List(args[0], args[1])
     else:
         return basictypes.Pair(args[0], args[1])
 
@@ -197,10 +229,7 @@ def car(args):
     """
     Get the first element.
     """
-    if isinstance(args[0], basictypes.Pair):
-        return args[0].car
-    else:
-        return args[0][0]
+    return args[0].car
 
 
 @_primitive
@@ -208,10 +237,7 @@ def cdr(args):
     """
     Get all elements except the first.
     """
-    if isinstance(args[0], basictypes.Pair):
-        return args[0].cdr
-    else:
-        return basictypes.List(args[0][1:])
+    return args[0].cdr
 
 
 @_primitive
@@ -219,15 +245,17 @@ def make_list(args):
     """
     Creates a list.
     """
-    return basictypes.List(args)
+    return basictypes.make_list(args)
 
 
 @_primitive
 def append(args):
     """
-    Appends two lists.
+    Appends two lists, the second list is shared.
     """
-    return basictypes.List(args[0] + args[1])
+    if not isinstance(args[1], basictypes.List):
+        raise apply.ApplyError("append: The last argument is not a list.")
+    return basictypes.make_list(args[0].value, args[1])
 
 
 @_primitive
@@ -251,8 +279,7 @@ def eval_primitive(args, env):  # This is a hack
         yield inout.disp(args[0])
 
     from schemepy.frontend import inout
-    from schemepy.evalapply import evaluate
-    exp = inout.read(gen())()
+    exp = inout.read(gen(), lexical_addressing=False)()
     return evaluate.evaluate(exp, env)
 
 
@@ -261,6 +288,57 @@ def apply_primitive(args, env):  # This is a hack
     """
     Applies a function on arguments.
     """
-    from schemepy.evalapply import apply
     from schemepy.backend import expressions
     return apply.apply(args[0], [expressions.SelfEvaluating(a) for a in args[1]], env)
+
+
+@_primitive
+def memoize(args):
+    """
+    Creates a memoized procedure, the optional second argument is the size of
+    the cache. A procedure that can not be memoized is an ApplyError.
+    """
+    if len(args) not in (1, 2) or len(args) == 2 and type(args[1]) is not basictypes.Integer:
+        raise apply.ApplyError("memoize: Expected a procedure and an optional cache size.")
+    try:
+        if len(args) == 1:
+            return procedures.Memoized(args[0])
+        return procedures.Memoized(args[0], args[1].value)
+    except (TypeError, ValueError) as error:
+        raise apply.ApplyError(str(error)) from error
+
+
+@_primitive
+def memo_stats(args):
+    """
+    Get the number of cache hits, cache misses and cached results of a
+    memoized procedure.
+    """
+    if not isinstance(args[0], procedures.Memoized):
+        raise apply.ApplyError("memo-stats: Not a memoized procedure.")
+    return basictypes.make_list([basictypes.integer(args[0].hits),
+                                 basictypes.integer(args[0].misses),
+                                 basictypes.integer(args[0].size)])
+
+
+@_primitive
+def runtime_stats(args):
+    """
+    Get the runtime counters, a list of (counter . count) pairs.
+    """
+    from schemepy import stats
+
+    def scheme_counts(counts):
+        """
+        Converts counts to (name . count) pairs.
+        """
+        return basictypes.make_list([basictypes.Pair(basictypes.Symbol(name),
+                                                     basictypes.integer(count))
+                                     for name, count in sorted(counts.items())])
+
+    snapshot = stats.snapshot()
+    return basictypes.make_list([
+        basictypes.Pair(basictypes.Symbol(name.replace('_', '-')), basictypes.integer(value))
+        if isinstance(value, int) else
+        basictypes.List(basictypes.Symbol(name.replace('_', '-')), scheme_counts(value))
+        for name, value in sorted(snapshot.items())])
@@ -2,13 +2,23 @@
 The procedures of the language.
 """
 import abc
-from schemepy.evalapply import evaluate
+import collections
+from schemepy.backend import basictypes
+from schemepy.evalapply import evaluate, trampoline
+from schemepy import environment
+
+
+MEMO_SIZE = 1024
+
+_MISSING = object()
 
 
 class Procedure(metaclass=abc.ABCMeta):
     """"
     Procedure abstract base class.
     """
+    __slots__ = ()
+
     @abc.abstractmethod
     def apply(self, arguments, env):
         """
@@ -16,6 +26,13 @@ class Procedure(metaclass=abc.ABCMeta):
         """
         pass
 
+    def name_as(self, identifier):
+        """
+        Names the procedure after the identifier of its definition, if it has
+        no name.
+        """
+        pass
+
 
 class Parameter:
     """"
@@ -91,24 +108,282 @@ class Primitive(Procedure):
     def apply(self, arguments, env):
         return self.__function([evaluate.force_evaluate(a, env) for a in arguments], env)
 
+    def apply_values(self, values, env):
+        """
+        Applies the function on already evaluated arguments.
+        """
+        return self.__function(values, env)
+
+
+def _strict_arguments_0(parameters, arguments, env):
+    """
+    Evaluates the arguments of a procedure without parameters.
+    """
+    return []
+
+
+def _strict_arguments_1(parameters, arguments, env):
+    """
+    Evaluates the argument of a procedure with one strict parameter.
+    """
+    return [evaluate.force_evaluate(arguments[0], env)]
+
+
+def _strict_arguments_2(parameters, arguments, env):
+    """
+    Evaluates the arguments of a procedure with two strict parameters.
+    """
+    force_evaluate = evaluate.force_evaluate
+    return [force_evaluate(arguments[0], env), force_evaluate(arguments[1], env)]
+
+
+def _strict_arguments_3(parameters, arguments, env):
+    """
+    Evaluates the arguments of a procedure with three strict parameters.
+    """
+    force_evaluate = evaluate.force_evaluate
+    return [force_evaluate(arguments[0], env), force_evaluate(arguments[1], env),
+            force_evaluate(arguments[2], env)]
+
+
+def _strict_arguments(parameters, arguments, env):
+    """
+    Evaluates the arguments of a procedure with strict parameters.
+    """
+    force_evaluate = evaluate.force_evaluate
+    return [force_evaluate(a, env) for a in arguments]
+
+
+def _arguments(parameters, arguments, env):
+    """
+    Evaluates the arguments of a procedure, each as its parameter type
+    requires.
+    """
+    return [p.evaluate(a, env) for p, a in zip(parameters, arguments)]
+
+
+_STRICT_ARGUMENTS = {
+    0: _strict_arguments_0,
+    1: _strict_arguments_1,
+    2: _strict_arguments_2,
+    3: _strict_arguments_3,
+    }
+
 
 class Compound(Procedure):
     """
     Compound procedure.
+
+    The evaluation of the arguments is specialised by the number and the types
+    of the parameters when the procedure is created. The frame of a call holds
+    the values in a slot array laid out by the lambda expression.
     """
-    def __init__(self, parameters, body, env):
+    __slots__ = ('__parameters', '__body', '__env', '__layout', '__arity', '__strict_arity',
+                 '__arguments', '__name')
+
+    def __init__(self, parameters, body, env, layout=None):
         self.__parameters = parameters
-        self.__parameter_names = [p.name for p in parameters]
         self.__body = body
         self.__env = env
+        self.__layout = layout if layout is not None else \
+            {p.name: slot for slot, p in enumerate(parameters)}
+        self.__arity = len(parameters)
+        if all(type(p) is Strict for p in parameters):
+            self.__strict_arity = self.__arity
+            self.__arguments = _STRICT_ARGUMENTS.get(self.__arity, _strict_arguments)
+        else:
+            self.__strict_arity = None
+            self.__arguments = _arguments
+        self.__name = None
 
     def __str__(self):
         return "<Compound procedure {} {{body}} {{environment}}>"\
             .format([str(p) for p in self.__parameters])
 
+    def __arity_error(self, count):
+        """
+        Creates the error of a call with a wrong number of arguments.
+        """
+        return environment.EnvError("The number of identifiers ({}) do not match the number of "
+                                    "values ({}).".format(self.__arity, count))
 
     def apply(self, arguments, env):
-        new_env = self.__env.extend(self.__parameter_names,
-                                    [p.evaluate(a, env)
-                                     for p, a in zip(self.__parameters, arguments)])
+        if len(arguments) != self.__arity:
+            raise self.__arity_error(len(arguments))
+        new_env = self.__env.extend_frame(self.__layout,
+                                          self.__arguments(self.__parameters, arguments, env))
         return evaluate.evaluate_sequence(self.__body, new_env)
+
+    def apply_values(self, values, env):
+        """
+        Applies the procedure on already evaluated arguments.
+        """
+        if len(values) != self.__arity:
+            raise self.__arity_error(len(values))
+        return evaluate.evaluate_sequence(self.__body, self.__env.extend_frame(self.__layout,
+                                                                               values))
+
+    def name_as(self, identifier):
+        if self.__name is None:
+            self.__name = identifier
+
+    @property
+    def name(self):
+        """
+        Get the identifier of the definition of the procedure, None if it is
+        anonymous.
+        """
+        return self.__name
+
+    @property
+    def parameters(self):
+        """
+        Get the parameters.
+        """
+        return self.__parameters
+
+    @property
+    def strict_arity(self):
+        """
+        Get the number of parameters if all parameters are strict, else None.
+        """
+        return self.__strict_arity
+
+    def owns(self, frame):
+        """
+        Checks if a frame was created by a call to this procedure.
+        """
+        return frame.layout is self.__layout and frame.outer is self.__env
+
+    def reapply(self, arguments, frame):
+        """
+        Applies the procedure again from a tail call in its own body.
+
+        The arguments are evaluated in the frame of the running call, which is
+        then reused for the new call unless it is captured.
+        """
+        if len(arguments) != self.__arity:
+            raise self.__arity_error(len(arguments))
+        return self.reapply_values(self.__arguments(self.__parameters, arguments, frame), frame)
+
+    def reapply_values(self, values, frame):
+        """
+        Applies the procedure again on already evaluated arguments.
+        """
+        if len(values) != self.__arity:
+            raise self.__arity_error(len(values))
+        if frame.captured:
+            frame = self.__env.extend_frame(self.__layout, values)
+        else:
+            frame.rebind(values)
+        return evaluate.evaluate_sequence(self.__body, frame)
+
+
+def _value_key(value):
+    """
+    Get the memoization key of an atom.
+    """
+    return type(value), value.value
+
+
+_MEMO_KEYS = {
+    basictypes.Integer: _value_key,
+    basictypes.Float: _value_key,
+    basictypes.Complex: _value_key,
+    basictypes.Symbol: _value_key,
+    basictypes.String: _value_key,
+    basictypes.List: lambda value: (basictypes.List, tuple(_memo_key(e) for e in value)),
+    basictypes.Pair: lambda value: (basictypes.Pair, _memo_key(value.car),
+                                    _memo_key(value.cdr)),
+    }
+
+
+def _memo_key(value):
+    """
+    Get the memoization key of a value.
+
+    Equal numbers, symbols, strings, pairs and lists have equal keys. Booleans
+    are unique and other values, procedures for example, are their own key.
+    """
+    key = _MEMO_KEYS.get(type(value))
+    return key(value) if key else value
+
+
+class Memoized(Procedure):
+    """"
+    Memoized procedure.
+
+    The results of a procedure are cached by the structure of the arguments,
+    which are evaluated strictly. The least recently used result is evicted
+    when the cache holds max_size results.
+    """
+    __slots__ = ('__procedure', '__max_size', '__cache', '__hits', '__misses')
+
+    def __init__(self, procedure, max_size=MEMO_SIZE):
+        if not isinstance(procedure, Procedure):
+            raise TypeError("memoize: Not a procedure.")
+        if getattr(procedure, 'strict_arity', 0) is None:
+            raise TypeError("memoize: The procedure has lazy parameters.")
+        if max_size < 1:
+            raise ValueError("memoize: The cache size is not positive.")
+        self.__procedure = procedure
+        self.__max_size = max_size
+        self.__cache = collections.OrderedDict()
+        self.__hits = 0
+        self.__misses = 0
+
+    def __str__(self):
+        return "<Memoized procedure {}>".format(self.__procedure)
+
+    def apply(self, arguments, env):
+        return self.apply_values([evaluate.force_evaluate(a, env) for a in arguments], env)
+
+    def name_as(self, identifier):
+        self.__procedure.name_as(identifier)
+
+    def apply_values(self, values, env):
+        """
+        Applies the procedure on already evaluated arguments, or get the
+        cached result.
+        """
+        key = tuple([_memo_key(v) for v in values])
+        cache = self.__cache
+        value = cache.get(key, _MISSING)
+        if value is _MISSING:
+            self.__misses += 1
+            value = trampoline.unpack(self.__procedure.apply_values(values, env))
+            cache[key] = value
+            if len(cache) > self.__max_size:
+                cache.popitem(last=False)
+            return value
+        self.__hits += 1
+        cache.move_to_end(key)
+        return value
+
+    @property
+    def hits(self):
+        """
+        Get the number of applications answered from the cache.
+        """
+        return self.__hits
+
+    @property
+    def misses(self):
+        """
+        Get the number of applications of the procedure.
+        """
+        return self.__misses
+
+    @property
+    def size(self):
+        """
+        Get the number of cached results.
+        """
+        return len(self.__cache)
+
+    @property
+    def max_size(self):
+        """
+        Get the maximum number of cached results.
+        """
+        return self.__max_size
@@ -1,6 +1,10 @@
 """
 Environment.
 """
+import contextlib
+import itertools
+
+
 class EnvError(Exception):
     """
     Environment exception.
@@ -8,50 +12,271 @@ class EnvError(Exception):
     pass
 
 
+_UNASSIGNED = object()
+_VERSIONS = itertools.count()
+
+
 class Environment:
     """
     Environment.
+
+    The values of a frame are stored in a slot array and the layout maps each
+    identifier to its slot. Frames created by the same lambda expression share
+    the layout, a frame copies it before adding a binding of its own.
+
+    A frame is captured when a closure or a promise keeps a reference to it.
+    A frame that is not captured can be reused by a tail call of the procedure
+    to itself.
+
+    The global frame has a version that changes whenever one of its bindings
+    is defined or assigned. Versions are unique across all frames, so a
+    (version, value) pair caches a global binding of one environment.
+
+    A frozen frame can not be changed. An overlay of a frozen frame is a new
+    global frame on top of it, an assignment to a binding of the frozen frame
+    binds the identifier in the overlay instead (copy-on-write). While an
+    overlay is active, the procedures defined in the frozen frames under it
+    use it as their global frame, like procedures defined in the overlay.
     """
+    __slots__ = ('__layout', '__slots', '__shared_layout', '__captured', '__outer', '__global',
+                 '__version', '__frozen', '__current')
+
     def __init__(self, identifiers=(), values=(), outer=None):
         if not len(identifiers) == len(values):
             raise EnvError("The number of identifiers ({}) do not match the number of values ({})."
                            .format(len(identifiers), len(values)))
-        self.__symbol_table = dict(zip(identifiers, values))
+        self.__layout = {}
+        self.__slots = []
+        self.__shared_layout = False
+        self.__captured = False
         self.__outer = outer
+        self.__global = outer.__global if outer else self
+        self.__version = next(_VERSIONS)
+        self.__frozen = False
+        self.__current = self
+        self.update(dict(zip(identifiers, values)))
 
     def __getitem__(self, identifier):
-        if identifier in self.__symbol_table:
-            return self.__symbol_table[identifier]
+        if identifier in self.__layout:
+            value = self.__slots[self.__layout[identifier]]
+            if value is _UNASSIGNED:
+                raise EnvError("Unassigned identifier: {}".format(identifier))
+            return value
         elif self.__outer:
-            return self.__outer[identifier]
+            return self.__next()[identifier]
         else:
             raise EnvError("Undefined identifier: {}".format(identifier))
 
     def __setitem__(self, identifier, value):
-        if identifier in self.__symbol_table:
-            self.__symbol_table[identifier] = value
-        elif self.__outer:
-            self.__outer[identifier] = value
-        else:
+        if identifier in self.__layout:
+            if self.__frozen:
+                raise EnvError("Frozen identifier: {}".format(identifier))
+            self.__slots[self.__layout[identifier]] = value
+            self.__version = next(_VERSIONS)
+        elif self.__outer is None:
             raise EnvError("Undefined identifier: {}".format(identifier))
+        elif self.__global is self:
+            if not self.__outer.__binds(identifier):
+                raise EnvError("Undefined identifier: {}".format(identifier))
+            self.update({identifier: value})
+        else:
+            self.__next()[identifier] = value
 
     def __str__(self):
         border = "+{0:-<78}+\n".format("")
         header = "|{:^78}|\n".format("Environment frame")
-        rows = "".join(["|{0:>20.20} : {1:<55.55}|\n".format(str(identifier), str(value))
-                        for identifier, value in self.__symbol_table.items()])
+        rows = "".join(["|{0:>20.20} : {1:<55.55}|\n".format(str(identifier),
+                                                            str(self.__slots[slot]))
+                        for identifier, slot in self.__layout.items()])
         arrow = (("{0:>39}\n" * 3) + "{1:>39}\n").format("|", "V")
         outer_frame = arrow + str(self.__outer) if self.__outer else ""
         return border + header + border + rows + border + outer_frame
 
+    @property
+    def global_frame(self):
+        """
+        Get the global frame, the active overlay of the outermost frame if
+        there is one.
+        """
+        return self.__global.__current
+
+    @property
+    def global_version(self):
+        """
+        Get the version of the global frame.
+        """
+        return self.__global.__current.__version
+
+    @property
+    def outer(self):
+        """
+        Get the enclosing frame.
+        """
+        return self.__outer
+
+    @property
+    def layout(self):
+        """
+        Get the layout.
+        """
+        return self.__layout
+
+    @property
+    def frozen(self):
+        """
+        Check if the frame is frozen.
+        """
+        return self.__frozen
+
+    def freeze(self):
+        """
+        Freezes the frame, its bindings can not be changed any more.
+        """
+        self.__frozen = True
+
+    def overlay(self):
+        """
+        Creates a global frame on top of this frozen frame, in O(1).
+        """
+        if not self.__frozen:
+            raise EnvError("Only a frozen environment can be overlaid.")
+        frame = Environment()
+        frame.__outer = self
+        return frame
+
+    @contextlib.contextmanager
+    def active(self):
+        """
+        Activates this global frame while the context is entered.
+
+        The procedures defined in the frozen frames under an active overlay
+        look up and assign global identifiers in the overlay, so they see the
+        bindings of the session that evaluates. A frame that is not an overlay
+        is always active.
+        """
+        previous = []
+        frame = self.__outer
+        while frame is not None:
+            previous.append((frame, frame.__current))
+            frame.__current = self
+            frame = frame.__outer
+        try:
+            yield self
+        finally:
+            for frame, current in reversed(previous):
+                frame.__current = current
+
+    @property
+    def captured(self):
+        """
+        Check if the frame is captured.
+        """
+        return self.__captured
+
+    def capture(self):
+        """
+        Marks the frame as captured, it is never reused.
+        """
+        self.__captured = True
+
+    def lookup(self, depth, slot):
+        """
+        Get the value of a lexical address.
+        """
+        frame = self
+        while depth:
+            frame = frame.__outer
+            depth -= 1
+        value = frame.__slots[slot]
+        if value is _UNASSIGNED:
+            raise EnvError("Unassigned identifier: {}".format(frame.__identifier(slot)))
+        return value
+
+    def assign(self, depth, slot, value):
+        """
+        Sets the value of a lexical address.
+        """
+        frame = self
+        while depth:
+            frame = frame.__outer
+            depth -= 1
+        frame.__slots[slot] = value
+
     def update(self, bindings):
         """
         Updates the environment with new bindings.
         """
-        self.__symbol_table.update(bindings)
+        if self.__frozen:
+            raise EnvError("Frozen environment: {}".format(", ".join(bindings)))
+        self.__version = next(_VERSIONS)
+        for identifier, value in bindings.items():
+            if identifier in self.__layout:
+                self.__slots[self.__layout[identifier]] = value
+            else:
+                if self.__shared_layout:
+                    self.__layout = dict(self.__layout)
+                    self.__shared_layout = False
+                self.__layout[identifier] = len(self.__slots)
+                self.__slots.append(value)
 
     def extend(self, identifiers=(), values=()):
         """
         Creates a new environment frame.
         """
         return Environment(identifiers, values, self)
+
+    def extend_frame(self, layout, values):
+        """
+        Creates a new environment frame with a precomputed layout.
+
+        The layout is shared, not copied. The values fill the first slots, the
+        remaining slots are unassigned.
+        """
+        frame = Environment.__new__(Environment)
+        if len(values) < len(layout):
+            values.extend([_UNASSIGNED] * (len(layout) - len(values)))
+        frame.__layout = layout
+        frame.__slots = values
+        frame.__shared_layout = True
+        frame.__captured = False
+        frame.__outer = self
+        frame.__global = self.__global
+        frame.__version = next(_VERSIONS)
+        frame.__frozen = False
+        return frame
+
+    def rebind(self, values):
+        """
+        Reuses a frame that is not captured for a new call.
+
+        The values fill the first slots, the remaining slots are unassigned.
+        """
+        assert not self.__captured
+        if len(values) < len(self.__layout):
+            values.extend([_UNASSIGNED] * (len(self.__layout) - len(values)))
+        self.__slots = values
+
+    def __next(self):
+        """
+        Get the frame an identifier that is not bound in this frame is looked
+        up in, the active overlay instead of the global frame.
+        """
+        outer = self.__outer
+        return outer.__current if outer is self.__global else outer
+
+    def __binds(self, identifier):
+        """
+        Checks if an identifier is bound in this frame or an outer frame.
+        """
+        frame = self
+        while frame:
+            if identifier in frame.__layout:
+                return True
+            frame = frame.__outer
+        return False
+
+    def __identifier(self, slot):
+        """
+        Get the identifier of a slot.
+        """
+        return next(identifier for identifier, s in self.__layout.items() if s == slot)
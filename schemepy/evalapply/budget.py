@@ -0,0 +1,135 @@
+"""
+Evaluation budgets, a maximum number of steps (fuel) and of seconds.
+
+A step is a call of a compound procedure or a bounce on the trampoline.
+Every loop of a program calls a compound procedure, so a runaway loop uses
+fuel. The clock is read every few steps only.
+
+While a budget is active, the applications of compound procedures and bounce
+are wrapped by metered versions, an evaluation without budget costs nothing.
+The wrapped functions are the ones installed when the budget is activated,
+so a budget can be combined with the profiler and the runtime counters.
+Budgets are activated while the evaluation lock is held, so they only meter
+the evaluation of one thread.
+"""
+import time
+from schemepy.backend import procedures
+from schemepy.evalapply import trampoline
+
+
+_CLOCK_INTERVAL = 1024
+
+
+def _metered(original, step):
+    """
+    Meters the calls of a function of three arguments.
+    """
+    def metered(first, second, third):
+        """
+        Calls the function.
+        """
+        step()
+        return original(first, second, third)
+    return metered
+
+
+class ResourceExhausted(RuntimeError):
+    """"
+    Budget exception.
+
+    The stats attribute holds the steps and the seconds used, and the
+    runtime counters if they are enabled.
+    """
+    def __init__(self, message, stats):
+        super().__init__(message)
+        self.stats = stats
+
+
+class Budget:
+    """
+    Evaluation budget, a context manager.
+
+    The budget allows fuel steps and seconds of wall clock time per
+    activation, None is unlimited. A nested activation is part of the
+    outer one.
+    """
+    def __init__(self, fuel=None, seconds=None):
+        self.__fuel = fuel
+        self.__seconds = seconds
+        self.__originals = None
+        self.__depth = 0
+        self.__steps = 0
+        self.__start = None
+
+    def __enter__(self):
+        self.__depth += 1
+        if self.__depth > 1 or self.__fuel is None and self.__seconds is None:
+            return self
+        self.__steps = 0
+        self.__start = time.monotonic()
+        step, compound = self.__meter(), procedures.Compound
+        metered = [(compound, 'apply'), (compound, 'apply_values'),
+                   (compound, 'reapply_values'), (trampoline, 'bounce')]
+        self.__originals = [(owner, attribute, vars(owner)[attribute])
+                            for owner, attribute in metered]
+        for owner, attribute in metered:
+            setattr(owner, attribute, _metered(vars(owner)[attribute], step))
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.__depth -= 1
+        if self.__depth or self.__originals is None:
+            return
+        for owner, attribute, original in self.__originals:
+            setattr(owner, attribute, original)
+        self.__originals = None
+
+    @property
+    def steps(self):
+        """
+        Get the number of steps of the last activation.
+        """
+        return self.__steps
+
+    def __meter(self):
+        """
+        Creates the step function, it counts down to the next check of the
+        fuel and the clock.
+        """
+        fuel, seconds = self.__fuel, self.__seconds
+        deadline = self.__start + seconds if seconds is not None else None
+        countdown = 0
+
+        def exhausted(message):
+            """
+            Creates the budget exception with the partial stats.
+            """
+            from schemepy import stats
+            partial = {'steps': self.__steps, 'seconds': time.monotonic() - self.__start}
+            if stats.enabled():
+                partial.update(stats.snapshot())
+            return ResourceExhausted(message, partial)
+
+        def check():
+            """
+            Checks the fuel and the clock, returns the number of steps to the
+            next check.
+            """
+            if fuel is not None and self.__steps > fuel:
+                raise exhausted("Out of fuel after {} steps.".format(fuel))
+            if deadline is not None and time.monotonic() >= deadline:
+                raise exhausted("Out of time after {} seconds.".format(seconds))
+            return _CLOCK_INTERVAL if fuel is None else \
+                min(_CLOCK_INTERVAL, fuel + 1 - self.__steps)
+
+        def step():
+            """
+            Uses a step.
+            """
+            nonlocal countdown
+            self.__steps += 1
+            countdown -= 1
+            if countdown <= 0:
+                countdown = check()
+
+        return step
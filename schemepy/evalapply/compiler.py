@@ -0,0 +1,303 @@
+""""
+Closure compiler.
+
+Compiles an analyzed expression tree once into nested Python closures, each
+closure takes an environment and returns the value of its expression. The
+expression type dispatch is done at compile time, so evaluating a compiled
+expression is a chain of direct closure calls.
+
+A closure in tail position may return a tail call, it is bounced on the
+trampoline of the caller. A closure in any other position is unpacked
+directly.
+"""
+from schemepy.backend import basictypes, expressions, procedures
+from schemepy.evalapply import apply, trampoline
+
+
+class Compiled(expressions.Expression):
+    """"
+    Compiled expression.
+    """
+    def __init__(self, code, exp):
+        self.__code = code
+        self.__exp = exp
+
+    def __str__(self):
+        return "<Compiled {}>".format(self.__exp)
+
+    def evaluate(self, env):
+        return self.__code(env)
+
+
+def _compile_sequence(seq):
+    """
+    Compiles a sequence, the last expression is in tail position.
+    """
+    unpack = trampoline.unpack
+    codes = [_compile(e) for e in seq]
+    if not codes:
+        return lambda env: None
+    elif len(codes) == 1:
+        return codes[0]
+    init, last = codes[:-1], codes[-1]
+
+    def sequence(env):
+        """
+        Evaluates a sequence.
+        """
+        for code in init:
+            unpack(code(env))
+        return last(env)
+    return sequence
+
+
+def _compile(exp):
+    """
+    Compiles an expression into a closure.
+    """
+    unpack = trampoline.unpack
+
+    def compile_constant():
+        """
+        Compiles a self evaluating or quote expression.
+        """
+        value = exp.value if isinstance(exp, expressions.SelfEvaluating) else exp.quotation
+        return lambda env: value
+
+    def compile_identifier():
+        """
+        Compiles an identifier.
+        """
+        identifier = exp.identifier
+        return lambda env: env[identifier]
+
+    def compile_local_identifier():
+        """
+        Compiles an identifier bound in a compound procedure frame.
+        """
+        depth, slot = exp.depth, exp.slot
+        return lambda env: env.lookup(depth, slot)
+
+    def compile_global_identifier():
+        """
+        Compiles an identifier bound in the global environment.
+
+        The value is cached with the version of the global frame.
+        """
+        identifier = exp.identifier
+        cached_version, cached_value = None, None
+
+        def global_identifier(env):
+            """
+            Evaluates an identifier bound in the global environment.
+            """
+            nonlocal cached_version, cached_value
+            version = env.global_version
+            if version != cached_version:
+                cached_value = env.global_frame[identifier]
+                cached_version = version
+            return cached_value
+        return global_identifier
+
+    def compile_definition():
+        """
+        Compiles a definition.
+        """
+        procedure = procedures.Procedure
+        identifier, value = exp.identifier, _compile(exp.value)
+
+        def definition(env):
+            """
+            Evaluates a definition.
+            """
+            evaluated = unpack(value(env))
+            if isinstance(evaluated, procedure):
+                evaluated.name_as(identifier)
+            env.update({identifier: evaluated})
+            return identifier
+        return definition
+
+    def compile_local_definition():
+        """
+        Compiles a definition in a compound procedure frame.
+        """
+        procedure = procedures.Procedure
+        identifier, slot, value = exp.identifier, exp.slot, _compile(exp.value)
+
+        def local_definition(env):
+            """
+            Evaluates a definition in a compound procedure frame.
+            """
+            evaluated = unpack(value(env))
+            if isinstance(evaluated, procedure):
+                evaluated.name_as(identifier)
+            env.assign(0, slot, evaluated)
+            return identifier
+        return local_definition
+
+    def compile_assignment():
+        """
+        Compiles an assignment.
+        """
+        identifier, value = exp.identifier, _compile(exp.value)
+
+        def assignment(env):
+            """
+            Evaluates an assignment.
+            """
+            env[identifier] = unpack(value(env))
+            return identifier
+        return assignment
+
+    def compile_local_assignment():
+        """
+        Compiles an assignment to an identifier bound in a compound procedure frame.
+        """
+        identifier, depth, slot, value = exp.identifier, exp.depth, exp.slot, _compile(exp.value)
+
+        def local_assignment(env):
+            """
+            Evaluates an assignment to an identifier bound in a compound procedure frame.
+            """
+            env.assign(depth, slot, unpack(value(env)))
+            return identifier
+        return local_assignment
+
+    def compile_global_assignment():
+        """
+        Compiles an assignment to an identifier bound in the global environment.
+        """
+        identifier, value = exp.identifier, _compile(exp.value)
+
+        def global_assignment(env):
+            """
+            Evaluates an assignment to an identifier bound in the global environment.
+            """
+            env.global_frame[identifier] = unpack(value(env))
+            return identifier
+        return global_assignment
+
+    def compile_if():
+        """
+        Compiles an if expression.
+        """
+        false = basictypes.FALSE
+        predicate, consequent = _compile(exp.predicate), _compile(exp.consequent)
+        alternative = _compile(exp.alternative) if exp.alternative else lambda env: false
+
+        def if_(env):
+            """
+            Evaluates an if expression.
+            """
+            if unpack(predicate(env)) is not false:
+                return consequent(env)
+            return alternative(env)
+        return if_
+
+    def compile_lambda():
+        """
+        Compiles a lambda expression.
+        """
+        compound = procedures.Compound
+        parameters, layout = exp.parameters, exp.layout
+        body = [Compiled(_compile_sequence(exp.body), exp)]
+
+        def lambda_(env):
+            """
+            Evaluates a lambda expression.
+            """
+            env.capture()
+            return compound(parameters, body, env, layout)
+        return lambda_
+
+    def compile_begin():
+        """
+        Compiles a begin expression.
+        """
+        return _compile_sequence(exp.sequence)
+
+    def compile_application():
+        """
+        Compiles an application.
+
+        Primitive procedures and compound procedures with as many strict
+        parameters as there are operands are applied on the values of the
+        operands directly, other procedures get the compiled operands.
+        """
+        primitive, compound = procedures.Primitive, procedures.Compound
+        generic_apply = apply.apply
+        operator = _compile(exp.operator)
+        operands = [_compile(o) for o in exp.operands]
+        compiled_operands = [Compiled(c, o) for c, o in zip(operands, exp.operands)]
+        arity = len(operands)
+
+        def application(env):
+            """
+            Evaluates an application.
+            """
+            procedure = unpack(operator(env))
+            if type(procedure) is primitive:
+                return procedure.apply_values([unpack(o(env)) for o in operands], env)
+            if type(procedure) is compound and procedure.strict_arity == arity:
+                return procedure.apply_values([unpack(o(env)) for o in operands], env)
+            return generic_apply(procedure, compiled_operands, env)
+        return application
+
+    def compile_self_application():
+        """
+        Compiles an application of a compound procedure to itself in tail position.
+
+        A procedure with as many strict parameters as there are operands gets
+        the values of the operands.
+        """
+        compound, generic_apply = procedures.Compound, apply.apply
+        operator = _compile(exp.operator)
+        operands = [_compile(o) for o in exp.operands]
+        compiled_operands = [Compiled(c, o) for c, o in zip(operands, exp.operands)]
+        arity = len(operands)
+
+        def self_application(env):
+            """
+            Evaluates an application of a compound procedure to itself.
+            """
+            procedure = unpack(operator(env))
+            if type(procedure) is compound and procedure.owns(env):
+                if procedure.strict_arity == arity:
+                    return procedure.reapply_values([unpack(o(env)) for o in operands], env)
+                return procedure.reapply(compiled_operands, env)
+            return generic_apply(procedure, compiled_operands, env)
+        return self_application
+
+    def compile_guarded():
+        """
+        Compiles an expression optimized for the values of global identifiers.
+        """
+        optimized, original, valid = _compile(exp.optimized), _compile(exp.original), exp.valid
+        return lambda env: optimized(env) if valid(env) else original(env)
+
+    compilers = {
+        expressions.SelfEvaluating: compile_constant,
+        expressions.Quote: compile_constant,
+        expressions.Identifier: compile_identifier,
+        expressions.LocalIdentifier: compile_local_identifier,
+        expressions.GlobalIdentifier: compile_global_identifier,
+        expressions.Definition: compile_definition,
+        expressions.LocalDefinition: compile_local_definition,
+        expressions.Assignment: compile_assignment,
+        expressions.LocalAssignment: compile_local_assignment,
+        expressions.GlobalAssignment: compile_global_assignment,
+        expressions.If: compile_if,
+        expressions.Lambda: compile_lambda,
+        expressions.Begin: compile_begin,
+        expressions.Application: compile_application,
+        expressions.SelfApplication: compile_self_application,
+        expressions.Guarded: compile_guarded,
+    }
+    return compilers[type(exp)]() if type(exp) in compilers else exp.evaluate
+
+
+def compile(exp):
+    """
+    Compiles an analyzed expression into a closure based expression.
+    """
+    return Compiled(_compile(exp), exp)
@@ -1,9 +1,22 @@
 """"
 Generic evaluate.
+
+Concurrency model: an evaluation is not thread-safe by itself, the tail
+calls of all threads share one record and the inline caches of shared
+expressions are not updated atomically. A thread evaluates while it holds
+LOCK, so evaluations are serialized within a process. The interpreter
+sessions take the lock, code that evaluates expressions directly in several
+threads must take it too. Sessions have their own global environments,
+frozen environments and the basic type constants are never changed, so they
+can be shared.
 """
+import threading
 from schemepy.evalapply import thunk, trampoline
 
 
+LOCK = threading.RLock()
+
+
 class EvalError(TypeError):
     """"
     Evaluate exception.
@@ -24,38 +37,50 @@ def evaluate(exp, env):
         raise EvalError("Unknown expression type.")
 
 
+_evaluate = evaluate.func
+
+
 def tail_call_evaluate(exp, env):
     """
     Performs a tail call to evaluate.
     """
-    return trampoline.bounce(evaluate)(exp, env)
+    return trampoline.bounce(_evaluate, exp, env)
 
 
 def evaluate_sequence(seq, env):
     """
     Evaluates a sequence.
     """
-    for exp in seq[:-1]:
-        evaluate(exp, env)
-    return tail_call_evaluate(seq[-1], env) if len(seq) > 0 else None
+    last = len(seq) - 1
+    if last < 0:
+        return None
+    for i in range(last):
+        evaluate(seq[i], env)
+    return trampoline.bounce(_evaluate, seq[last], env)
 
 
 def force_evaluate(exp, env):
     """
     Evaluates an expression and forces eventual thunks.
+
+    The trampoline forces the thunks.
     """
-    return thunk.unpack(evaluate(exp, env))
+    return evaluate(exp, env)
 
 
 def delay_evaluate(exp, env):
     """
     Delays a call to evaluate.
+
+    Forcing the thunk bounces to evaluate on the trampoline that forces it.
     """
-    return thunk.Thunk(evaluate, exp, env)
+    env.capture()
+    return thunk.Thunk(_evaluate, exp, env)
 
 
 def delay_memo_evaluate(exp, env):
     """
     Delays a call to evaluate (with memoization).
     """
+    env.capture()
     return thunk.ThunkMemo(evaluate, exp, env)
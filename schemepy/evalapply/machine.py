@@ -0,0 +1,459 @@
+""""
+Explicit control evaluator, a register machine with the control stack on the
+heap.
+
+Compiles an analyzed expression tree once into machine code. A piece of code
+takes the environment and the stack and returns a value, a thunk or a tail
+call. Code that needs the value of a subexpression saves the registers it
+still needs on the stack, with a resume function on top, and continues with
+the code of the subexpression. The machine loop performs the tail calls,
+forces the thunks and passes each value to the resume function on top of the
+stack.
+
+A compound procedure returns its body as a tail call, the machine continues
+with the code of the body instead of calling it, so the depth of a recursion
+is bounded by the memory and not by the Python stack. Constants, identifiers
+and lambda expressions are evaluated directly.
+
+Procedures applied outside of the machine, by the interpreter, memoized
+procedures and the eval primitive, run a nested machine.
+"""
+from schemepy.backend import basictypes, expressions, procedures
+from schemepy.evalapply import apply, evaluate, thunk, trampoline
+
+
+class Machine(expressions.Expression):
+    """"
+    Machine code expression.
+    """
+    def __init__(self, code, exp):
+        self.__code = code
+        self.__exp = exp
+
+    def __str__(self):
+        return "<Machine {}>".format(self.__exp)
+
+    @property
+    def code(self):
+        """
+        Get the machine code.
+        """
+        return self.__code
+
+    def evaluate(self, env):
+        return run(self.__code, env)
+
+
+def _resume_memo(value, stack):
+    """
+    Sets the value of a memo thunk forced by the machine.
+    """
+    return stack.pop().settle(value)
+
+
+def run(code, env):
+    """
+    Runs machine code in an environment, returns the value.
+
+    A thunk of a machine expression is forced by continuing with its code.
+    """
+    tail_call, evaluate_func, machine = trampoline._TAIL_CALL, evaluate._evaluate, Machine
+    thunk_type, memo_type = thunk.Thunk, thunk.ThunkMemo
+    stack = []
+    value = code(env, stack)
+    while True:
+        if value is tail_call:
+            func, exp = tail_call.func, tail_call.first
+            if func is evaluate_func and type(exp) is machine:
+                value = exp.code(tail_call.second, stack)
+            else:
+                value = func(exp, tail_call.second)
+        elif isinstance(value, thunk_type):
+            exp = value._exp
+            if type(exp) is machine:
+                if type(value) is memo_type:
+                    stack.append(value)
+                    stack.append(_resume_memo)
+                value = exp.code(value._env, stack)
+            else:
+                value = value()
+        elif stack:
+            value = stack.pop()(value, stack)
+        else:
+            return value
+
+
+def _compile_simple(exp):
+    """
+    Compiles an expression that does not call procedures into a function of
+    the environment, get None for other expressions.
+    """
+    def compile_constant():
+        """
+        Compiles a self evaluating or quote expression.
+        """
+        value = exp.value if isinstance(exp, expressions.SelfEvaluating) else exp.quotation
+        return lambda env: value
+
+    def compile_identifier():
+        """
+        Compiles an identifier.
+        """
+        identifier = exp.identifier
+        return lambda env: env[identifier]
+
+    def compile_local_identifier():
+        """
+        Compiles an identifier bound in a compound procedure frame.
+        """
+        depth, slot = exp.depth, exp.slot
+        return lambda env: env.lookup(depth, slot)
+
+    def compile_global_identifier():
+        """
+        Compiles an identifier bound in the global environment.
+
+        The value is cached with the version of the global frame.
+        """
+        identifier = exp.identifier
+        cached_version, cached_value = None, None
+
+        def global_identifier(env):
+            """
+            Evaluates an identifier bound in the global environment.
+            """
+            nonlocal cached_version, cached_value
+            version = env.global_version
+            if version != cached_version:
+                cached_value = env.global_frame[identifier]
+                cached_version = version
+            return cached_value
+        return global_identifier
+
+    def compile_lambda():
+        """
+        Compiles a lambda expression, the body is one machine expression.
+        """
+        compound = procedures.Compound
+        parameters, layout = exp.parameters, exp.layout
+        body = [Machine(_compile_sequence(exp.body), exp)]
+
+        def lambda_(env):
+            """
+            Evaluates a lambda expression.
+            """
+            env.capture()
+            return compound(parameters, body, env, layout)
+        return lambda_
+
+    def compile_guarded():
+        """
+        Compiles an expression optimized for the values of global identifiers,
+        if both the optimized and the original expression are simple.
+        """
+        optimized, original = _compile_simple(exp.optimized), _compile_simple(exp.original)
+        if optimized is None or original is None:
+            return None
+        valid = exp.valid
+        return lambda env: optimized(env) if valid(env) else original(env)
+
+    compilers = {
+        expressions.SelfEvaluating: compile_constant,
+        expressions.Quote: compile_constant,
+        expressions.Identifier: compile_identifier,
+        expressions.LocalIdentifier: compile_local_identifier,
+        expressions.GlobalIdentifier: compile_global_identifier,
+        expressions.Lambda: compile_lambda,
+        expressions.Guarded: compile_guarded,
+    }
+    return compilers[type(exp)]() if type(exp) in compilers else None
+
+
+def _compile_then(exp, finish):
+    """
+    Compiles the evaluation of an expression followed by a function of the
+    value, the environment and the stack.
+    """
+    thunk_type = thunk.Thunk
+    simple = _compile_simple(exp)
+
+    def resume(value, stack):
+        """
+        Finishes with the value of the expression.
+        """
+        return finish(value, stack.pop(), stack)
+
+    if simple is not None:
+        def then_simple(env, stack):
+            """
+            Evaluates the expression directly, a thunk is forced by the machine.
+            """
+            value = simple(env)
+            if isinstance(value, thunk_type):
+                stack.append(env)
+                stack.append(resume)
+                return value
+            return finish(value, env, stack)
+        return then_simple
+
+    code = _compile(exp)
+
+    def then(env, stack):
+        """
+        Continues with the code of the expression.
+        """
+        stack.append(env)
+        stack.append(resume)
+        return code(env, stack)
+    return then
+
+
+def _compile_sequence(seq):
+    """
+    Compiles a sequence, the last expression is in tail position.
+    """
+    codes = [_compile(e) for e in seq]
+    if not codes:
+        return lambda env, stack: None
+    elif len(codes) == 1:
+        return codes[0]
+    last = len(codes) - 1
+
+    def resume(value, stack):
+        """
+        Continues with the next expression of the sequence.
+        """
+        index = stack.pop()
+        if index == last:
+            return codes[last](stack.pop(), stack)
+        env = stack[-1]
+        stack.append(index + 1)
+        stack.append(resume)
+        return codes[index](env, stack)
+
+    def sequence(env, stack):
+        """
+        Evaluates a sequence.
+        """
+        stack.append(env)
+        stack.append(1)
+        stack.append(resume)
+        return codes[0](env, stack)
+    return sequence
+
+
+def _compile(exp):
+    """
+    Compiles an expression into machine code.
+    """
+    def compile_definition():
+        """
+        Compiles a definition.
+        """
+        procedure, identifier = procedures.Procedure, exp.identifier
+
+        def definition(value, env, stack):
+            """
+            Binds the value of a definition.
+            """
+            if isinstance(value, procedure):
+                value.name_as(identifier)
+            env.update({identifier: value})
+            return identifier
+        return _compile_then(exp.value, definition)
+
+    def compile_local_definition():
+        """
+        Compiles a definition in a compound procedure frame.
+        """
+        procedure, identifier, slot = procedures.Procedure, exp.identifier, exp.slot
+
+        def local_definition(value, env, stack):
+            """
+            Binds the value of a definition in a compound procedure frame.
+            """
+            if isinstance(value, procedure):
+                value.name_as(identifier)
+            env.assign(0, slot, value)
+            return identifier
+        return _compile_then(exp.value, local_definition)
+
+    def compile_assignment():
+        """
+        Compiles an assignment.
+        """
+        identifier = exp.identifier
+
+        def assignment(value, env, stack):
+            """
+            Assigns the value of an assignment.
+            """
+            env[identifier] = value
+            return identifier
+        return _compile_then(exp.value, assignment)
+
+    def compile_local_assignment():
+        """
+        Compiles an assignment to an identifier bound in a compound procedure frame.
+        """
+        identifier, depth, slot = exp.identifier, exp.depth, exp.slot
+
+        def local_assignment(value, env, stack):
+            """
+            Assigns the value to an identifier bound in a compound procedure frame.
+            """
+            env.assign(depth, slot, value)
+            return identifier
+        return _compile_then(exp.value, local_assignment)
+
+    def compile_global_assignment():
+        """
+        Compiles an assignment to an identifier bound in the global environment.
+        """
+        identifier = exp.identifier
+
+        def global_assignment(value, env, stack):
+            """
+            Assigns the value to an identifier bound in the global environment.
+            """
+            env.global_frame[identifier] = value
+            return identifier
+        return _compile_then(exp.value, global_assignment)
+
+    def compile_if():
+        """
+        Compiles an if expression.
+        """
+        false = basictypes.FALSE
+        consequent = _compile(exp.consequent)
+        alternative = _compile(exp.alternative) if exp.alternative else \
+            lambda env, stack: false
+
+        def branch(value, env, stack):
+            """
+            Continues with the branch selected by the value of the predicate.
+            """
+            if value is not false:
+                return consequent(env, stack)
+            return alternative(env, stack)
+        return _compile_then(exp.predicate, branch)
+
+    def compile_begin():
+        """
+        Compiles a begin expression.
+        """
+        return _compile_sequence(exp.sequence)
+
+    def compile_application():
+        """
+        Compiles an application.
+
+        The operands are evaluated from left to right once the operator is
+        known, the operands of lazy parameters are delayed. A procedure that
+        is neither primitive, compound nor memoized is applied on machine
+        expressions of the operands.
+        """
+        primitive, compound, memoized = procedures.Primitive, procedures.Compound, \
+            procedures.Memoized
+        strict, thunk_type, generic_apply = procedures.Strict, thunk.Thunk, apply.apply
+        self_application = type(exp) is expressions.SelfApplication
+        simple_operands = [_compile_simple(o) for o in exp.operands]
+        codes = [_compile(o) for o in exp.operands]
+        operands = [Machine(c, o) for c, o in zip(codes, exp.operands)]
+        arity = len(operands)
+
+        def call(procedure, values, env):
+            """
+            Applies the procedure on the values.
+            """
+            if self_application and type(procedure) is compound and procedure.owns(env):
+                return procedure.reapply_values(values, env)
+            return procedure.apply_values(values, env)
+
+        def resume_operand(value, stack):
+            """
+            Continues with the operands after the value of an operand.
+            """
+            values = stack.pop()
+            values.append(value)
+            parameters = stack.pop()
+            procedure = stack.pop()
+            return operate(procedure, parameters, values, stack.pop(), stack)
+
+        def operate(procedure, parameters, values, env, stack):
+            """
+            Evaluates the remaining operands, then applies the procedure.
+
+            The parameters are given when some of them are lazy.
+            """
+            index = len(values)
+            while index < arity:
+                if parameters is not None and type(parameters[index]) is not strict:
+                    values.append(parameters[index].evaluate(operands[index], env))
+                    index += 1
+                    continue
+                simple = simple_operands[index]
+                if simple is not None:
+                    value = simple(env)
+                    if not isinstance(value, thunk_type):
+                        values.append(value)
+                        index += 1
+                        continue
+                stack.append(env)
+                stack.append(procedure)
+                stack.append(parameters)
+                stack.append(values)
+                stack.append(resume_operand)
+                return value if simple is not None else codes[index](env, stack)
+            return call(procedure, values, env)
+
+        def application(procedure, env, stack):
+            """
+            Applies the value of the operator.
+            """
+            procedure_type = type(procedure)
+            if procedure_type is primitive or procedure_type is memoized:
+                return operate(procedure, None, [], env, stack)
+            if procedure_type is compound:
+                if procedure.strict_arity == arity:
+                    return operate(procedure, None, [], env, stack)
+                if procedure.strict_arity is None and len(procedure.parameters) == arity:
+                    return operate(procedure, procedure.parameters, [], env, stack)
+            return generic_apply(procedure, operands, env)
+        return _compile_then(exp.operator, application)
+
+    def compile_guarded():
+        """
+        Compiles an expression optimized for the values of global identifiers.
+        """
+        simple = _compile_simple(exp)
+        if simple is not None:
+            return lambda env, stack: simple(env)
+        optimized, original, valid = _compile(exp.optimized), _compile(exp.original), exp.valid
+        return lambda env, stack: optimized(env, stack) if valid(env) else original(env, stack)
+
+    compilers = {
+        expressions.Definition: compile_definition,
+        expressions.LocalDefinition: compile_local_definition,
+        expressions.Assignment: compile_assignment,
+        expressions.LocalAssignment: compile_local_assignment,
+        expressions.GlobalAssignment: compile_global_assignment,
+        expressions.If: compile_if,
+        expressions.Begin: compile_begin,
+        expressions.Application: compile_application,
+        expressions.SelfApplication: compile_application,
+        expressions.Guarded: compile_guarded,
+    }
+    if type(exp) in compilers:
+        return compilers[type(exp)]()
+    simple = _compile_simple(exp)
+    if simple is not None:
+        return lambda env, stack: simple(env)
+    return lambda env, stack: exp.evaluate(env)
+
+
+def compile(exp):
+    """
+    Compiles an analyzed expression into a machine code expression.
+    """
+    return Machine(_compile(exp), exp)
@@ -1,38 +1,60 @@
 """
-Thunks, delayed function calls.
+Thunks, delayed evaluations of an expression in an environment.
+
+A thunk is a compact object that holds the evaluate function, the expression
+and the environment, no closure is allocated. Forcing a thunk may return a
+tail call or another thunk, the trampoline goes on with it in its loop.
 """
+import threading
+
+
+_FORCE_LOCK = threading.RLock()
+
+
 class Thunk:
     """
     Thunk.
     """
-    def __init__(self, func, *args, **kwargs):
-        self._call = lambda: func(*args, **kwargs)
+    __slots__ = ('_func', '_exp', '_env')
+
+    def __init__(self, func, exp, env):
+        self._func = func
+        self._exp = exp
+        self._env = env
 
     def __call__(self):
-        return self._call()
+        return self._func(self._exp, self._env)
 
 
 class ThunkMemo(Thunk):
     """
     Thunk with memoization.
+
+    The function must return a value, not a tail call or a thunk. It is
+    called once, then the expression and the environment are dropped so the
+    environment can be collected, and the thunk returns the value.
+
+    The thunk can be forced from several threads. The value is set before
+    the function is dropped, so a thread that sees the function dropped does
+    not need the lock.
     """
-    def __init__(self, func, *args, **kwargs):
-        self.__evaluated = False
-        self.__memo = None
-        super().__init__(func, *args, **kwargs)
+    __slots__ = ('__value',)
 
     def __call__(self):
-        if not self.__evaluated:
-            self.__memo = self._call()
-            del self._call
-            self.__evaluated = True
-        return self.__memo
-
+        if self._func is not None:
+            with _FORCE_LOCK:
+                if self._func is not None:
+                    self.__value = self._func(self._exp, self._env)
+                    self._func = self._exp = self._env = None
+        return self.__value
 
-def unpack(obj):
-    """
-    Performs the function call of thunks until a non-thunk object is reached.
-    """
-    while isinstance(obj, Thunk):
-        obj = obj()
-    return obj
+    def settle(self, value):
+        """
+        Sets the value of a thunk whose expression was evaluated by the
+        caller, returns the value of the thunk.
+        """
+        with _FORCE_LOCK:
+            if self._func is not None:
+                self.__value = value
+                self._func = self._exp = self._env = None
+        return self.__value
@@ -3,11 +3,11 @@ Tail call optimizer.
 
 Usage:
  * Decorate the function with @Trampoline
- * Wrap all tail calls with bounce
+ * Replace all tail calls with bounce
 
 Example:
 Original:
-def fact(n, acc=1):
+def fact(n, acc):
     if n <= 1:
         return acc
     else:
@@ -15,15 +15,34 @@ def fact(n, acc=1):
 
 Tail call optimized:
 @Trampoline  # This line is added.
-def fact(n, acc=1):
+def fact(n, acc):
     if n <= 1:
         return acc
     else:
-        return bounce(fact)(n - 1, acc * n)  # This line is changed.
+        return bounce(fact, n - 1, acc * n)  # This line is changed.
+
+A tail call does not allocate anything. There is a single tail call record,
+bounce fills it in and returns it, and the trampoline reads it before anything
+else can bounce. Functions with two arguments are supported.
 """
 from schemepy.evalapply import thunk
 
 
+class _TailCall:
+    """
+    Tail call record.
+    """
+    __slots__ = ('func', 'first', 'second')
+
+    def __init__(self):
+        self.func = None
+        self.first = None
+        self.second = None
+
+
+_TAIL_CALL = _TailCall()
+
+
 class Trampoline:
     """
     Trampoline decorator (tail call optimizer).
@@ -38,20 +57,31 @@ class Trampoline:
         """
         return self.__func
 
-    def __call__(self, *args, **kwargs):
-        continuation = self.__func(*args, **kwargs)
-        return thunk.unpack(continuation)
+    def __call__(self, first, second):
+        return unpack(self.__func(first, second))
 
 
-def bounce(call):
+def bounce(call, first, second):
     """
     Performs a bounce on the trampoline.
     """
-    def tail_call(*args, **kwargs):
-        """
-        Pack the tail call in a thunk to be bounced on the trampoline.
-        """
-        return thunk.Thunk(func, *args, **kwargs)
-
-    func = call.func if isinstance(call, Trampoline) else call  # Do not bounce a trampoline.
+    tail_call = _TAIL_CALL
+    tail_call.func = call.func if isinstance(call, Trampoline) else call  # Do not bounce a trampoline.
+    tail_call.first = first
+    tail_call.second = second
     return tail_call
+
+
+def unpack(obj):
+    """
+    Performs tail calls and the function calls of thunks until a value is
+    reached.
+    """
+    tail_call = _TAIL_CALL
+    while True:
+        if obj is tail_call:
+            obj = tail_call.func(tail_call.first, tail_call.second)
+        elif isinstance(obj, thunk.Thunk):
+            obj = obj()
+        else:
+            return obj
@@ -0,0 +1,158 @@
+"""
+Lexical addressing, resolves identifiers to frame slots.
+
+Identifiers bound by an enclosing lambda expression are resolved to a lexical
+address, the number of frames to walk out and the slot in that frame. All
+other identifiers are bound in the global environment. Internal definitions
+are scanned out of the lambda body so that they get a slot in the frame.
+
+An application of a defined procedure to itself in tail position of its body
+becomes a self application, which can reuse the frame of the running call.
+"""
+from schemepy.backend import expressions
+
+
+def _scan_definitions(exp):
+    """
+    Get the identifiers of the definitions evaluated in the frame of exp.
+    """
+    scanners = {
+        expressions.Definition: lambda: [exp.identifier] + _scan_definitions(exp.value),
+        expressions.Assignment: lambda: _scan_definitions(exp.value),
+        expressions.If: lambda: (_scan_definitions(exp.predicate)
+                                 + _scan_definitions(exp.consequent)
+                                 + (_scan_definitions(exp.alternative) if exp.alternative
+                                    else [])),
+        expressions.Begin: lambda: [d for e in exp.sequence for d in _scan_definitions(e)],
+        expressions.Application: lambda: (_scan_definitions(exp.operator)
+                                          + [d for o in exp.operands for d in _scan_definitions(o)]),
+    }
+    return scanners[type(exp)]() if type(exp) in scanners else []
+
+
+def _resolve(identifier, scopes):
+    """
+    Get the lexical address of an identifier, None if it is global.
+    """
+    for depth, layout in enumerate(scopes):
+        if identifier in layout:
+            return depth, layout[identifier]
+    return None
+
+
+def _refers_to(exp, reference):
+    """
+    Checks if an addressed expression is the addressed identifier reference.
+    """
+    if type(exp) is not type(reference) or exp.identifier != reference.identifier:
+        return False
+    return type(exp) is not expressions.LocalIdentifier or \
+        (exp.depth, exp.slot) == (reference.depth, reference.slot)
+
+
+def _self_applications(exp, reference):
+    """
+    Replaces the applications of reference in tail position of exp with self
+    applications.
+    """
+    if type(exp) is expressions.If:
+        return expressions.If(exp.predicate, _self_applications(exp.consequent, reference),
+                              _self_applications(exp.alternative, reference)
+                              if exp.alternative else None)
+    elif type(exp) is expressions.Begin and exp.sequence:
+        return expressions.Begin(exp.sequence[:-1]
+                                 + [_self_applications(exp.sequence[-1], reference)])
+    elif type(exp) is expressions.Application and _refers_to(exp.operator, reference):
+        return expressions.SelfApplication(exp.operator, exp.operands)
+    return exp
+
+
+def _address(exp, scopes):
+    """
+    Resolves the identifiers of an expression.
+
+    The scopes are the layouts of the enclosing lambda expressions, innermost
+    first.
+    """
+    def address_identifier():
+        """
+        Resolve an identifier.
+        """
+        address = _resolve(exp.identifier, scopes)
+        if address is None:
+            return expressions.GlobalIdentifier(exp.identifier)
+        return expressions.LocalIdentifier(exp.identifier, *address)
+
+    def address_definition():
+        """
+        Resolve a definition.
+        """
+        value = _address(exp.value, scopes)
+        if type(value) is expressions.Lambda and value.body and \
+                exp.identifier not in value.layout:
+            reference = _address(expressions.Identifier(exp.identifier), [{}] + scopes)
+            body = value.body[:-1] + [_self_applications(value.body[-1], reference)]
+            value = expressions.Lambda(value.parameters, body, value.definitions)
+        if not scopes:
+            return expressions.Definition(exp.identifier, value)
+        return expressions.LocalDefinition(exp.identifier, scopes[0][exp.identifier], value)
+
+    def address_assignment():
+        """
+        Resolve an assignment.
+        """
+        address = _resolve(exp.identifier, scopes)
+        value = _address(exp.value, scopes)
+        if address is None:
+            return expressions.GlobalAssignment(exp.identifier, value)
+        depth, slot = address
+        return expressions.LocalAssignment(exp.identifier, depth, slot, value)
+
+    def address_if():
+        """
+        Resolve an if expression.
+        """
+        return expressions.If(_address(exp.predicate, scopes),
+                              _address(exp.consequent, scopes),
+                              _address(exp.alternative, scopes) if exp.alternative else None)
+
+    def address_lambda():
+        """
+        Resolve a lambda expression, its body is evaluated in a new frame.
+        """
+        definitions = [d for e in exp.body for d in _scan_definitions(e)]
+        layout = expressions.Lambda.frame_layout(exp.parameters, definitions)
+        return expressions.Lambda(exp.parameters,
+                                  [_address(e, [layout] + scopes) for e in exp.body],
+                                  definitions)
+
+    def address_begin():
+        """
+        Resolve a begin expression.
+        """
+        return expressions.Begin([_address(e, scopes) for e in exp.sequence])
+
+    def address_application():
+        """
+        Resolve an application.
+        """
+        return expressions.Application(_address(exp.operator, scopes),
+                                       [_address(o, scopes) for o in exp.operands])
+
+    addressers = {
+        expressions.Identifier: address_identifier,
+        expressions.Definition: address_definition,
+        expressions.Assignment: address_assignment,
+        expressions.If: address_if,
+        expressions.Lambda: address_lambda,
+        expressions.Begin: address_begin,
+        expressions.Application: address_application,
+    }
+    return addressers[type(exp)]() if type(exp) in addressers else exp
+
+
+def address(exp):
+    """
+    Resolves the identifiers of a top level expression to lexical addresses.
+    """
+    return _address(exp, [])
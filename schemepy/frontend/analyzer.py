@@ -5,88 +5,11 @@ from schemepy.backend import basictypes, expressions, procedures
 from schemepy.frontend import syntaxerror
 
 
-class _AnalyzeTypeError(TypeError):
-    """
-    Analyze exception.
-    """
-    pass
-
-
-def _to_basic_type(exp):
-    """
-    Creates a basic type.
-    """
-    def to_string():
-        """
-        Creates a string basic type.
-        """
-        if len(exp) >= 2 and exp[0] == '"' and exp[-1] == '"':
-            return basictypes.String(exp[1:-1])
-        raise _AnalyzeTypeError
-
-    def to_number():
-        """
-        Creates a number basic type.
-        """
-        try:
-            value = int(exp)
-            return basictypes.Integer(value)
-        except ValueError:
-            pass
-        try:
-            value = float(exp)
-            return basictypes.Float(value)
-        except ValueError:
-            pass
-        try:
-            value = complex(exp.replace('j', 'x').replace('i', 'j', 1))
-            return basictypes.Complex(value)
-        except ValueError:
-            pass
-        raise _AnalyzeTypeError
-
-    if isinstance(exp, str):
-        try:
-            return to_string()
-        except _AnalyzeTypeError:
-            pass
-        try:
-            return to_number()
-        except _AnalyzeTypeError:
-            pass
-    raise _AnalyzeTypeError
-
-
 def _is_identifier(exp):
     """
     Checks if the expression is an identifier.
     """
-    if isinstance(exp, str):
-        try:
-            _to_basic_type(exp)
-        except _AnalyzeTypeError:
-            return True
-    return False
-
-
-def _self_evaluating(exp):
-    """
-    Creates a self evaluating expression.
-    """
-    try:
-        basic_type = _to_basic_type(exp)
-        return expressions.SelfEvaluating(basic_type)
-    except _AnalyzeTypeError:
-        raise
-
-
-def _identifier(exp):
-    """
-    Creates an identifier expression.
-    """
-    if _is_identifier(exp):
-        return expressions.Identifier(exp)
-    raise _AnalyzeTypeError
+    return isinstance(exp, str)
 
 
 def _analyze_quote(exp):  # TODO: Handle other kind of quotes
@@ -108,12 +31,11 @@ def _analyze_quote(exp):  # TODO: Handle other kind of quotes
                 return basictypes.Pair(analyze_quotation(quotation[0]),
                                        analyze_quotation(quotation[2]))
             else:
-                return basictypes.List([analyze_quotation(q) for q in quotation])
+                return basictypes.make_list([analyze_quotation(q) for q in quotation])
+        elif _is_identifier(quotation):
+            return basictypes.Symbol(quotation)
         else:
-            try:
-                return _to_basic_type(quotation)
-            except _AnalyzeTypeError:
-                return basictypes.Symbol(quotation)
+            return quotation
 
     if len(exp) != 1:
         raise syntaxerror.SchemeSyntaxError("quote: 1 part expected, {} is given.".format(len(exp)))
@@ -175,6 +97,21 @@ def _analyze_define(exp):
     return expressions.Definition(define_identifier(), define_value())
 
 
+def _analyze_define_memo(exp):
+    """
+    Transforms a memoized procedure definition to a definition of a memoized
+    lambda expression, (define name (memoize (lambda ...))).
+    """
+    if len(exp) < 2 or not isinstance(exp[0], list):
+        raise syntaxerror.SchemeSyntaxError("define-memo: Procedure definition expected.")
+    definition = _analyze_define(exp)
+    if any(type(p) is not procedures.Strict for p in definition.value.parameters):
+        raise syntaxerror.SchemeSyntaxError("define-memo: Lazy parameters can not be memoized.")
+    return expressions.Definition(definition.identifier,
+                                  expressions.Application(expressions.Identifier('memoize'),
+                                                          [definition.value]))
+
+
 def _analyze_if(exp):
     """
     Creates a if expression.
@@ -320,7 +257,7 @@ def _analyze_cond(exp):
         if (not isinstance(cond_first_clause(), list)) or len(cond_first_clause()) < 2:
             raise syntaxerror.SchemeSyntaxError("cond: Clause syntax error.")
     if len(exp) == 0:
-        return expressions.SelfEvaluating(basictypes.Boolean(False))
+        return expressions.SelfEvaluating(basictypes.FALSE)
     elif cond_clause_predicate() == "else":
         if len(exp) > 1:
             raise syntaxerror.SchemeSyntaxError("cond: Else clause not last.")
@@ -331,72 +268,51 @@ def _analyze_cond(exp):
                               _analyze_cond(cond_rest_clauses()))
 
 
-def _special_form(exp):
-    """
-    Creates a special form expression.
-    """
-    def special_form_type():
-        """
-        Get the type part.
-        """
-        return exp[0]
-
-    def special_form_parts():
-        """
-        Get the rest of the special form.
-        """
-        return exp[1:]
-
-    special_forms = {
-        'quote': _analyze_quote,
-        'set!': _analyze_set,
-        'define': _analyze_define,
-        'if': _analyze_if,
-        'lambda': _analyze_lambda,
-        'begin': _analyze_begin,
-        'cond': _analyze_cond,
-        # TODO: let (let->lambda), let* (let*->nested lets), for, while, ...
-        }
-    if not (isinstance(exp, list)
-            and len(exp) >= 1
-            and isinstance(exp[0], str)
-            and exp[0] in special_forms):
-        raise _AnalyzeTypeError
-    return special_forms[special_form_type()](special_form_parts())
+_SPECIAL_FORMS = {
+    'quote': _analyze_quote,
+    'set!': _analyze_set,
+    'define': _analyze_define,
+    'define-memo': _analyze_define_memo,
+    'if': _analyze_if,
+    'lambda': _analyze_lambda,
+    'begin': _analyze_begin,
+    'cond': _analyze_cond,
+    # TODO: let (let->lambda), let* (let*->nested lets), for, while, ...
+    }
 
 
-def _application(exp):
+def _compound(exp):
     """
-    Creates an application expression.
+    Creates a special form or an application expression.
     """
-    def application_operator():
+    def compound_operator():
         """
         Get the operator part.
         """
         return exp[0]
 
-    def application_arguments():
+    def compound_parts():
         """
-        Get the arguments part.
+        Get the rest of the expression.
         """
         return exp[1:]
 
-    if not isinstance(exp, list):
-        raise _AnalyzeTypeError
     if len(exp) == 0:
         raise syntaxerror.SchemeSyntaxError("application: Empty application.")
-    return expressions.Application(analyze(application_operator()),
-                                   [analyze(a) for a in application_arguments()])
+    if _is_identifier(compound_operator()) and compound_operator() in _SPECIAL_FORMS:
+        return _SPECIAL_FORMS[compound_operator()](compound_parts())
+    return expressions.Application(analyze(compound_operator()),
+                                   [analyze(a) for a in compound_parts()])
 
 
 def analyze(exp):
     """
     Analyzes a tokenized expression and creates backend objects.
     """
-    analyzers = [_self_evaluating, _identifier, _special_form, _application]
-    for analyzer in analyzers:
-        try:
-            return analyzer(exp)
-        except _AnalyzeTypeError:
-            pass
+    if _is_identifier(exp):
+        return expressions.Identifier(exp)
+    elif isinstance(exp, list):
+        return _compound(exp)
+    elif isinstance(exp, basictypes.BasicType):
+        return expressions.SelfEvaluating(exp)
     raise syntaxerror.SchemeSyntaxError("Unknown expression type.")
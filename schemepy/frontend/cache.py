@@ -0,0 +1,96 @@
+"""
+Expression cache, stores the parsed expressions of a source file on disk.
+
+The cache of foo.scm is foo.scmc next to it, like a .pyc file. It holds the
+analyzed and addressed expressions, before any backend compiles them, and is
+keyed by the hash of the source and the interpreter version. A stale, corrupt
+or unwritable cache is ignored.
+"""
+import hashlib
+import os
+import pickle
+import sys
+import schemepy
+from schemepy.frontend import inout, syntaxerror
+
+
+_MAGIC = b"SCMC"
+_FORMAT = 1
+_SUFFIX = "c"
+
+
+def cache_path(path):
+    """
+    Get the cache path of a source path.
+    """
+    return path + _SUFFIX
+
+
+def _key(source):
+    """
+    Get the key of a source, the hash of the source and the interpreter
+    version.
+    """
+    digest = hashlib.sha256(source)
+    digest.update("{} {} {}".format(_FORMAT, schemepy.__version__,
+                                    sys.implementation.cache_tag).encode())
+    return digest.digest()
+
+
+def _read(path, key):
+    """
+    Reads the expressions from a cache, returns None if the cache is missing
+    or invalid.
+    """
+    try:
+        with open(path, "rb") as cache:
+            if cache.read(len(_MAGIC)) != _MAGIC or cache.read(len(key)) != key:
+                return None
+            return pickle.load(cache)
+    except Exception:  # A corrupt cache can fail in many ways, it is rebuilt.
+        return None
+
+
+def _write(path, key, expressions):
+    """
+    Writes the expressions to a cache, the cache is replaced atomically.
+    """
+    temporary = "{}.{}".format(path, os.getpid())
+    try:
+        with open(temporary, "wb") as cache:
+            cache.write(_MAGIC)
+            cache.write(key)
+            pickle.dump(expressions, cache, pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, path)
+    except (OSError, pickle.PicklingError, RecursionError):
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
+
+
+def load(path):
+    """
+    Get the expressions of a source file, from its cache if it is valid.
+
+    The source is parsed and the cache is written otherwise. Returns None if
+    the source has a syntax error, the expressions before the error are not
+    cached.
+    """
+    with open(path, "rb") as stream:
+        source = stream.read()
+    key = _key(source)
+    expressions = _read(cache_path(path), key)
+    if expressions is not None:
+        return expressions
+    reader = inout.read(iter([source.decode()]))
+    expressions = []
+    try:
+        while True:
+            expressions.append(reader())
+    except StopIteration:
+        pass
+    except syntaxerror.SchemeSyntaxError:
+        return None
+    _write(cache_path(path), key, expressions)
+    return expressions
@@ -3,12 +3,15 @@ Frontend interface.
 """
 import logging
 from schemepy.backend import procedures, basictypes
-from schemepy.frontend import analyzer, tokenizer
+from schemepy.frontend import addresser, analyzer, tokenizer
 
 
-def read(stream):
+def read(stream, lexical_addressing=True):
     """
     Parses a stream and creates backend objects.
+
+    Lexical addressing requires that the expressions are evaluated in the
+    global environment.
     """
     token = tokenizer.Tokenizer(stream)
 
@@ -19,7 +22,7 @@ def read(stream):
         tokens = token.tokenize()
         logging.debug("Tokens: " + str(tokens))
         exp = analyzer.analyze(tokens)
-        return exp
+        return addresser.address(exp) if lexical_addressing else exp
 
     return read_next
 
@@ -40,5 +43,6 @@ def disp(exp):
         basictypes.List: lambda: "(" + " ".join([disp(e) for e in exp]) + ")",
         procedures.Primitive: lambda: "#<primitive procedure>",
         procedures.Compound: lambda: "#<compound procedure>",
+        procedures.Memoized: lambda: "#<memoized procedure>",
     }
     return printers[type(exp)]() if exp else ""
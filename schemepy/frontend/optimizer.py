@@ -0,0 +1,205 @@
+"""
+Optimizer, simplifies addressed expressions before they are evaluated.
+
+ * Global identifiers bound to booleans, like #t and #f, are constants.
+ * Applications of pure primitives on constants are folded into constants.
+ * If expressions with a constant predicate are replaced by the branch taken.
+ * Nested begin expressions are flattened and constants that are not the
+   value of a sequence are removed.
+
+A global identifier is used only if it is bound when the expression is
+optimized and is not defined or assigned in the expression. An expression
+simplified with the value of a global identifier is guarded: once the
+identifier is redefined or assigned, the original expression is evaluated.
+"""
+from schemepy.backend import basictypes, expressions, primitives
+from schemepy import environment
+
+
+_CONSTANTS = (expressions.SelfEvaluating, expressions.Quote, expressions.Lambda)
+_NUMBERS = (basictypes.Integer, basictypes.Float, basictypes.Complex)
+
+
+def _scan_redefinitions(exp):
+    """
+    Get the global identifiers defined or assigned in exp.
+    """
+    scanners = {
+        expressions.Definition: lambda: {exp.identifier} | _scan_redefinitions(exp.value),
+        expressions.GlobalAssignment: lambda: {exp.identifier} | _scan_redefinitions(exp.value),
+        expressions.LocalDefinition: lambda: _scan_redefinitions(exp.value),
+        expressions.LocalAssignment: lambda: _scan_redefinitions(exp.value),
+        expressions.If: lambda: (_scan_redefinitions(exp.predicate)
+                                 | _scan_redefinitions(exp.consequent)
+                                 | _scan_redefinitions(exp.alternative)),
+        expressions.Lambda: lambda: {d for e in exp.body for d in _scan_redefinitions(e)},
+        expressions.Begin: lambda: {d for e in exp.sequence for d in _scan_redefinitions(e)},
+        expressions.SelfApplication: lambda: {d for o in exp.operands
+                                              for d in _scan_redefinitions(o)},
+        expressions.Application: lambda: (_scan_redefinitions(exp.operator)
+                                          | {d for o in exp.operands
+                                             for d in _scan_redefinitions(o)}),
+    }
+    return scanners[type(exp)]() if type(exp) in scanners else set()
+
+
+def _constant(exp):
+    """
+    Get the constant expression exp evaluates to and the global bindings it
+    depends on, None if exp is not a constant.
+    """
+    if type(exp) in _CONSTANTS:
+        return exp, {}
+    if type(exp) is expressions.Guarded and type(exp.optimized) in _CONSTANTS:
+        return exp.optimized, exp.bindings
+    return None, None
+
+
+def _guard(optimized, original, bindings):
+    """
+    Guards an optimized expression with the global bindings it depends on.
+    """
+    return expressions.Guarded(optimized, original, bindings) if bindings else optimized
+
+
+def _optimize(exp, bound):
+    """
+    Optimizes an expression.
+
+    bound gets the value a global identifier is bound to, None if it can not
+    be used.
+    """
+    def optimize_sequence(sequence):
+        """
+        Optimize a sequence, the optimized sequence is never empty.
+        """
+        optimized = []
+        for e in sequence:
+            e = _optimize(e, bound)
+            optimized += e.sequence if type(e) is expressions.Begin else [e]
+        return [e for e in optimized[:-1] if type(e) not in _CONSTANTS] + optimized[-1:]
+
+    def optimize_global_identifier():
+        """
+        Optimize a global identifier, a boolean is a constant.
+        """
+        value = bound(exp.identifier)
+        if type(value) is not basictypes.Boolean:
+            return exp
+        return _guard(expressions.SelfEvaluating(value), exp, {exp.identifier: value})
+
+    def optimize_definition():
+        """
+        Optimize a definition.
+        """
+        return expressions.Definition(exp.identifier, _optimize(exp.value, bound))
+
+    def optimize_local_definition():
+        """
+        Optimize an internal definition.
+        """
+        return expressions.LocalDefinition(exp.identifier, exp.slot, _optimize(exp.value, bound))
+
+    def optimize_local_assignment():
+        """
+        Optimize an assignment of a local identifier.
+        """
+        return expressions.LocalAssignment(exp.identifier, exp.depth, exp.slot,
+                                           _optimize(exp.value, bound))
+
+    def optimize_global_assignment():
+        """
+        Optimize an assignment of a global identifier.
+        """
+        return expressions.GlobalAssignment(exp.identifier, _optimize(exp.value, bound))
+
+    def optimize_if():
+        """
+        Optimize an if expression, a constant predicate selects the branch.
+        """
+        predicate = _optimize(exp.predicate, bound)
+        consequent = _optimize(exp.consequent, bound)
+        alternative = _optimize(exp.alternative, bound) if exp.alternative else None
+        original = expressions.If(predicate, consequent, alternative)
+        constant, bindings = _constant(predicate)
+        if constant is None:
+            return original
+        if type(constant) is not expressions.SelfEvaluating or \
+                constant.value is not basictypes.FALSE:
+            return _guard(consequent, original, bindings)
+        return _guard(alternative if alternative else expressions.SelfEvaluating(basictypes.FALSE),
+                      original, bindings)
+
+    def optimize_lambda():
+        """
+        Optimize a lambda expression.
+        """
+        return expressions.Lambda(exp.parameters, optimize_sequence(exp.body), exp.definitions)
+
+    def optimize_begin():
+        """
+        Optimize a begin expression.
+        """
+        if not exp.sequence:
+            return exp
+        sequence = optimize_sequence(exp.sequence)
+        return sequence[0] if len(sequence) == 1 else expressions.Begin(sequence)
+
+    def optimize_application():
+        """
+        Optimize an application, a pure primitive on numbers is folded.
+        """
+        operator = _optimize(exp.operator, bound)
+        operands = [_optimize(o, bound) for o in exp.operands]
+        original = type(exp)(operator, operands)
+        if type(operator) is not expressions.GlobalIdentifier:
+            return original
+        primitive = bound(operator.identifier)
+        function = primitives.PURE.get(primitive)
+        constants = [_constant(o) for o in operands]
+        if not function or not all(type(c) is expressions.SelfEvaluating and
+                                   isinstance(c.value, _NUMBERS) for c, _ in constants):
+            return original
+        bindings = {operator.identifier: primitive}
+        for _, b in constants:
+            bindings.update(b)
+        try:
+            value = function([c.value for c, _ in constants])
+        except Exception:  # The error is raised when the application is evaluated.
+            return original
+        return _guard(expressions.SelfEvaluating(value), original, bindings)
+
+    optimizers = {
+        expressions.GlobalIdentifier: optimize_global_identifier,
+        expressions.Definition: optimize_definition,
+        expressions.LocalDefinition: optimize_local_definition,
+        expressions.LocalAssignment: optimize_local_assignment,
+        expressions.GlobalAssignment: optimize_global_assignment,
+        expressions.If: optimize_if,
+        expressions.Lambda: optimize_lambda,
+        expressions.Begin: optimize_begin,
+        expressions.Application: optimize_application,
+        expressions.SelfApplication: optimize_application,
+    }
+    return optimizers[type(exp)]() if type(exp) in optimizers else exp
+
+
+def optimize(exp, env):
+    """
+    Optimizes an addressed top level expression evaluated in the global
+    environment env.
+    """
+    redefinitions = _scan_redefinitions(exp)
+
+    def bound(identifier):
+        """
+        Get the value of a global identifier that is not redefined.
+        """
+        if identifier in redefinitions:
+            return None
+        try:
+            return env.global_frame[identifier]
+        except environment.EnvError:
+            return None
+
+    return _optimize(exp, bound)
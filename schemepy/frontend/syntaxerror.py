@@ -6,3 +6,10 @@ class SchemeSyntaxError(SyntaxError):
     Syntax error exception.
     """
     pass
+
+
+class IncompleteInputError(SchemeSyntaxError):
+    """
+    Syntax error exception, the input ends inside an expression.
+    """
+    pass
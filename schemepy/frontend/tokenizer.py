@@ -1,31 +1,108 @@
 """
 Scheme tokenizer, reads tokens from a stream and creates Scheme expressions.
+
+A Scheme expression is a symbol (str), a literal (basic type) or a list of
+Scheme expressions. Each token is classified once, by the scanner pattern and
+for atoms by the number patterns.
 """
 import re
+import sys
+from schemepy.backend import basictypes
 from schemepy.frontend import syntaxerror
 
 
-def _tokgen(regexp, stream):
+_OPEN = 'open'
+_CLOSE = 'close'
+_QUOTE = 'quote'
+_STRING = 'string'
+_COMMENT = 'comment'
+_INTEGER = 'integer'
+_FLOAT = 'float'
+_ATOM = 'atom'
+_ERROR = 'error'
+_END = 'end', None
+
+_NUMBER = r'(?:(?:\d+(?:_\d+)*)?\.\d+(?:_\d+)*|\d+(?:_\d+)*\.?)(?:[eE][+-]?\d+(?:_\d+)*)?' \
+          r'|(?i:inf(?:inity)?|nan)'
+_COMPLEX_PATTERN = re.compile(r'[+-]?(?:(?:{0})[+-])?(?:{0})?j'.format(_NUMBER))
+
+
+def _atom(token):
+    """
+    Creates a complex number basic type or a symbol from an atom token.
+
+    The imaginary unit of a complex number is i.
+    """
+    if 'i' in token:
+        value = token.replace('j', 'x').replace('i', 'j', 1)
+        if _COMPLEX_PATTERN.fullmatch(value):
+            return basictypes.Complex(complex(value))
+    return sys.intern(token)
+
+
+class _Scanner:
     """
-    Generates tokens from a stream.
+    Position based scanner, generates tagged tokens from a stream of text
+    chunks.
+
+    A chunk is one or more lines, a token can not span two chunks. The pattern
+    is matched at a position in the chunk, the rest of the chunk is never
+    copied. Comments are skipped, an error is generated as an error token and
+    the rest of the line is skipped.
     """
-    text = ""
-    while True:
-        if not text:
-            text = next(stream)
-        token, text = re.match(regexp, text).groups()
-        if token:
-            yield token
-        elif text:
-            yield syntaxerror.SchemeSyntaxError(text)
-            text = ""
+    __end = r'''(?![^\s('"`,;)])'''
+    __pattern = re.compile(r'''\s*(?:(?P<{}>\()|(?P<{}>\))|(?P<{}>,@|['`,])'''
+                           r'''|(?P<{}>"(?:[\\].|[^\\"])*")|(?P<{}>;.*)'''
+                           r'''|(?P<{}>[+-]?\d+(?:_\d+)*{})|(?P<{}>[+-]?(?:{}){})'''
+                           r'''|(?P<{}>[^\s('"`,;)]+))?'''
+                           .format(_OPEN, _CLOSE, _QUOTE, _STRING, _COMMENT, _INTEGER, __end,
+                                   _FLOAT, _NUMBER, __end, _ATOM))
+
+    def __init__(self, stream):
+        self.__stream = stream
+        self.__text = ""
+        self.__match = None
+        self.__line = 1
+
+    def __iter__(self):
+        line = 1
+        for text in self.__stream:
+            self.__text, self.__line, self.__match = text, line, None
+            line += text.count("\n") + (0 if text.endswith("\n") else 1)
+            pos, end = 0, len(text)
+            while pos < end:
+                for match in _Scanner.__pattern.finditer(text, pos):
+                    tag = match.lastgroup
+                    if tag == _COMMENT:
+                        continue
+                    self.__match = match
+                    if tag:
+                        yield tag, match.group(tag)
+                    elif match.end() < end:
+                        line_end = text.find("\n", match.end())
+                        pos = line_end if line_end >= 0 else end
+                        yield _ERROR, text[match.end():pos]
+                        break
+                else:
+                    pos = end
+
+    @property
+    def position(self):
+        """
+        Get the line and column of the last token.
+        """
+        if self.__match is None:
+            return self.__line, 1
+        pos = self.__match.start(self.__match.lastgroup) if self.__match.lastgroup else \
+            self.__match.end()
+        line_start = self.__text.rfind("\n", 0, pos) + 1
+        return self.__line + self.__text.count("\n", 0, pos), pos - line_start + 1
 
 
 class Tokenizer:
     """
     Scheme tokenizer.
     """
-    __regexp = r'''\s*(,@|[('`,)]|"(?:[\\].|[^\\"])*"|;.*|[^\s('"`,;)]*)(.*)'''
     __quotes = {
         "'": "quote",
         "`": "quasiquote",
@@ -34,38 +111,48 @@ class Tokenizer:
         }
 
     def __init__(self, stream):
-        self.__token_stream = _tokgen(Tokenizer.__regexp, stream)
+        self.__scanner = _Scanner(stream)
+        self.__token_stream = iter(self.__scanner)
+
+    @property
+    def position(self):
+        """
+        Get the line and column of the last token.
+        """
+        return self.__scanner.position
 
     def tokenize(self):
         """
         Get the next expression.
+
+        Raises StopIteration at the end of the stream.
         """
-        def next_token():
-            """
-            Get next token.
-            """
-            token = next(self.__token_stream)
-            try:
-                raise token
-            except TypeError:
-                return token
+        token_stream = self.__token_stream
 
-        def read_token(token=None):
+        def read_token(tag, token):
             """
             Handle a token.
             """
-            if token is None:
-                token = next_token()
-            if token.startswith(";"):
-                return read_token()
-            elif token == "(":
+            if tag == _ATOM:
+                return _atom(token)
+            elif tag == _OPEN:
                 return read_list()
-            elif token in Tokenizer.__quotes:
-                return [Tokenizer.__quotes[token], read_token()]
-            elif token == ")":
-                raise syntaxerror.SchemeSyntaxError("Unexpected ')'")
+            elif tag == _INTEGER:
+                return basictypes.integer(int(token))
+            elif tag == _FLOAT:
+                return basictypes.Float(float(token))
+            elif tag == _QUOTE:
+                return [Tokenizer.__quotes[token], read_token(*next(token_stream, _END))]
+            elif tag == _STRING:
+                return basictypes.String(token[1:-1])
+            elif tag == _CLOSE:
+                raise syntaxerror.SchemeSyntaxError("Unexpected ')' (line {}, column {})"
+                                                    .format(*self.position))
+            elif token is None:
+                raise syntaxerror.IncompleteInputError("Unexpected end of input.")
             else:
-                return token
+                raise syntaxerror.SchemeSyntaxError("{} (line {}, column {})"
+                                                    .format(token, *self.position))
 
         def read_list():
             """
@@ -73,10 +160,9 @@ class Tokenizer:
             """
             tokens = []
             while True:
-                token = next_token()
-                if token == ")":
+                tag, token = next(token_stream, _END)
+                if tag == _CLOSE:
                     return tokens
-                else:
-                    tokens.append(read_token(token))
+                tokens.append(read_token(tag, token))
 
-        return read_token()
+        return read_token(*next(token_stream))
@@ -1,14 +1,30 @@
 """
 The global environment, contain bindings for primitives.
+
+A global environment with a prelude can be frozen and used as the base of
+many sessions:
+
+    base = create()
+    ... evaluate the prelude in base ...
+    base.freeze()
+    session = create(base)
+
+A session is an overlay of the base, it is created in O(1). Definitions and
+assignments in a session bind the identifier in the session only, the base
+and the other sessions do not see them. While the session is active, see
+Environment.active, the procedures of the prelude look up and assign global
+identifiers in the session first, as if the prelude was evaluated in it.
 """
-from schemepy.backend import primitives
+from schemepy.backend import primitives, procedures
 from schemepy import environment
 
 
-def create():
+def create(base=None):
     """
-    Creates a global environment.
+    Creates a global environment, an overlay of base if it is given.
     """
+    if base is not None:
+        return base.overlay()
     env = environment.Environment()
     env.update({
         '#t': primitives.TRUE,
@@ -33,5 +49,17 @@ def create():
         'display': primitives.display,
         'eval': primitives.eval_primitive,
         'apply': primitives.apply_primitive,
+        'memoize': primitives.memoize,
+        'memo-stats': primitives.memo_stats,
+        'runtime-stats': primitives.runtime_stats,
         })
     return env
+
+
+def names():
+    """
+    Get the global identifier of each primitive procedure.
+    """
+    env = create()
+    return {env[name]: name for name in env.layout
+            if isinstance(env[name], procedures.Procedure)}
@@ -0,0 +1,226 @@
+"""
+Embeddable interpreter.
+
+An interpreter is a session with its own global environment. Python values
+are converted to Scheme values when they are passed in and Scheme values are
+converted back when they are returned:
+
+    bool                   <-> #t, #f
+    int, float, complex    <-> numbers
+    str                    <-> strings (symbols are returned as str)
+    list, tuple            <-> lists (lists are returned as list)
+    None                    -> null
+    (car, cdr)             <-  pairs
+
+Procedures and Scheme values are passed as they are.
+"""
+from schemepy.backend import basictypes, procedures
+from schemepy.evalapply import apply, budget, evaluate, trampoline
+from schemepy.frontend import inout, optimizer
+from schemepy import globalenvironment, parallel
+
+
+_PARSE_CACHE_SIZE = 256
+
+
+def _scheme_list(value):
+    """
+    Converts a Python sequence to a Scheme list.
+    """
+    return basictypes.make_list([to_scheme(e) for e in value])
+
+
+_TO_SCHEME = {
+    bool: lambda value: basictypes.TRUE if value else basictypes.FALSE,
+    int: basictypes.integer,
+    float: basictypes.Float,
+    complex: basictypes.Complex,
+    str: basictypes.String,
+    list: _scheme_list,
+    tuple: _scheme_list,
+    type(None): lambda value: basictypes.NULL,
+    }
+
+
+def to_scheme(value):
+    """
+    Converts a Python value to a Scheme value.
+    """
+    converter = _TO_SCHEME.get(type(value))
+    if converter:
+        return converter(value)
+    elif isinstance(value, (basictypes.BasicType, procedures.Procedure)):
+        return value
+    raise TypeError("Could not convert Python value to Scheme value: {}".format(value))
+
+
+def _value(value):
+    """
+    Get the Python value of a basic type.
+    """
+    return value.value
+
+
+_TO_PYTHON = {
+    basictypes.Boolean: _value,
+    basictypes.Integer: _value,
+    basictypes.Float: _value,
+    basictypes.Complex: _value,
+    basictypes.String: _value,
+    basictypes.Symbol: _value,
+    basictypes.List: lambda value: [to_python(e) for e in value],
+    basictypes.Pair: lambda value: (to_python(value.car), to_python(value.cdr)),
+    }
+
+
+def to_python(value):
+    """
+    Converts a Scheme value to a Python value.
+    """
+    converter = _TO_PYTHON.get(type(value))
+    return converter(value) if converter else value
+
+
+class Interpreter:
+    """
+    Interpreter session.
+
+    The global environment is created from base, a frozen environment, if it
+    is given. While the session evaluates, the procedures of base use its
+    global environment, as if they were defined in the session. Each
+    expression is optimized if optimize is true, and the backend, if given,
+    compiles it before it is evaluated.
+
+    With more than one process, parallel-map evaluates the applications on a
+    pool of worker processes that replay the top level expressions of the
+    session which changed its global environment, see parallel. The session should then be closed.
+
+    Evaluations take the evaluation lock, so sessions can be used from
+    several threads, see evaluate.
+
+    Each evaluation and call may take at most fuel steps and timeout seconds,
+    if they are given, else it raises ResourceExhausted, see budget.
+    """
+    def __init__(self, base=None, backend=None, optimize=False, processes=None, fuel=None,
+                 timeout=None):
+        if base is not None and processes and processes > 1:
+            raise ValueError("A session with a base environment can not use worker processes.")
+        self.__env = globalenvironment.create(base)
+        self.__backend = backend
+        self.__optimize = optimize
+        self.__budget = budget.Budget(fuel, timeout)
+        self.__parsed = {}
+        self.__prepared = {}
+        self.__exps = []
+        self.__pool = parallel.Pool(processes, self.__exps, backend, optimize) \
+            if processes and processes > 1 else None
+        self.__env.update({
+            'parallel-map': parallel.parallel_map_primitive(self.__exps, self.__pool),
+            })
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Stops the worker processes, if any.
+        """
+        if self.__pool:
+            self.__pool.close()
+
+    @property
+    def environment(self):
+        """
+        Get the global environment.
+        """
+        return self.__env
+
+    def evaluate(self, exp):
+        """
+        Evaluates a parsed expression, returns the Scheme value.
+
+        With worker processes, the expressions that change the global
+        environment are kept for them.
+        """
+        with evaluate.LOCK:
+            version = self.__env.global_version
+            prepared = self.__prepare(exp)
+            with self.__env.active(), self.__budget:  # The compilation is not budgeted.
+                value = evaluate.force_evaluate(prepared, self.__env)
+            if self.__pool and self.__env.global_version != version:
+                self.__exps.append(exp)
+        return value
+
+    def __prepare(self, exp):
+        """
+        Get the optimized and compiled expression of a parsed expression.
+
+        The expressions of the cached sources are prepared once. An optimized
+        expression checks the global bindings it depends on when it is
+        evaluated, so it stays valid when they change.
+        """
+        prepared = self.__prepared.get(exp)
+        if prepared is None:
+            prepared = exp
+            if self.__optimize:
+                prepared = optimizer.optimize(prepared, self.__env)
+            if self.__backend:
+                prepared = self.__backend(prepared)
+            if exp in self.__prepared:
+                self.__prepared[exp] = prepared
+        return prepared
+
+    def parse(self, source):
+        """
+        Get the parsed expressions of a source, the most recent sources are
+        cached with their optimized and compiled expressions.
+
+        Raises IncompleteInputError if the source ends inside an expression.
+        """
+        expressions = self.__parsed.get(source)
+        if expressions is None:
+            reader = inout.read(iter([source]))
+            expressions = []
+            try:
+                while True:
+                    expressions.append(reader())
+            except StopIteration:
+                pass
+            if len(self.__parsed) >= _PARSE_CACHE_SIZE:
+                for exp in self.__parsed.pop(next(iter(self.__parsed))):
+                    self.__prepared.pop(exp, None)
+            self.__parsed[source] = expressions
+            self.__prepared.update(dict.fromkeys(expressions))
+        return expressions
+
+    def eval_string(self, source):
+        """
+        Evaluates the expressions of a source, returns the Python value of the
+        last one.
+        """
+        value = None
+        for exp in self.parse(source):
+            value = self.evaluate(exp)
+        return to_python(value)
+
+    def eval_many(self, sources):
+        """
+        Evaluates sources in order, returns the Python value of each.
+        """
+        return [self.eval_string(source) for source in sources]
+
+    def call(self, name, *args):
+        """
+        Applies the procedure bound to a global identifier on Python values,
+        returns the Python value.
+        """
+        procedure = self.__env.global_frame[name]
+        if not isinstance(procedure, procedures.Procedure):
+            raise apply.ApplyError("Not a procedure: {}".format(name))
+        values = [to_scheme(a) for a in args]
+        with evaluate.LOCK, self.__env.active(), self.__budget:
+            value = trampoline.unpack(procedure.apply_values(values, self.__env))
+        return to_python(value)
@@ -0,0 +1,182 @@
+"""
+Parallel evaluation on a process pool.
+
+Each worker process has its own interpreter session. It is warmed with the
+top level expressions of the session that started it which changed the
+global environment, definitions and assignments, in order. The expressions
+are sent as analyzed expressions, which are pickleable. The parallel-map
+primitive applies a procedure defined in the session on the elements of a
+list in chunks on the workers and gathers the results in order.
+
+The procedure must be pure: changes of global bindings in the workers are
+not seen by the session, and the arguments and results are sent between the
+processes, so they must be data, not procedures. Changes of the state of
+closures in the session are not seen by the workers either.
+"""
+import contextlib
+import io
+import multiprocessing
+from schemepy.backend import basictypes, expressions, procedures
+from schemepy.evalapply import apply, trampoline
+from schemepy import environment
+
+
+_CHUNKS_PER_PROCESS = 4
+
+_worker_session = None
+_worker_error = None
+
+
+def _warm_worker(exps, backend, optimize):
+    """
+    Worker initializer, creates the session of the worker and evaluates the
+    expressions in it, their output is discarded.
+
+    The error of an expression that fails is kept, the worker raises it for
+    each chunk.
+    """
+    global _worker_session, _worker_error
+    from schemepy import interpreter
+    _worker_session = interpreter.Interpreter(backend=backend, optimize=optimize)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for exp in exps:
+            try:
+                _worker_session.evaluate(exp)
+            except Exception as error:  # An initializer that raises is restarted forever.
+                _worker_error = "parallel-map: A worker could not evaluate a top level " \
+                                "expression: {}".format(error)
+                return
+
+
+def _apply_chunk(name, chunk):
+    """
+    Applies the procedure bound to name in the worker session on each value of
+    a chunk.
+    """
+    if _worker_error:
+        raise apply.ApplyError(_worker_error)
+    env = _worker_session.environment
+    procedure = env.global_frame[name]
+    return [trampoline.unpack(procedure.apply_values([value], env)) for value in chunk]
+
+
+def _run_file(path, backend, optimize, use_cache, fuel, timeout):
+    """
+    Runs a program file in a worker, returns the exit status and the output.
+    """
+    from schemepy import script
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+        status = script.run_file(path, backend, optimize, use_cache, fuel=fuel, timeout=timeout)
+    return status, output.getvalue()
+
+
+def run_files(paths, processes, backend=None, optimize=False, use_cache=True, fuel=None,
+              timeout=None):
+    """
+    Runs independent program files on a process pool, each in its own
+    session.
+
+    Yields the exit status and the output of each file, in the order of the
+    paths.
+    """
+    with multiprocessing.Pool(processes) as pool:
+        yield from pool.starmap(_run_file, [(path, backend, optimize, use_cache, fuel, timeout)
+                                            for path in paths], chunksize=1)
+
+
+def _chunks(values, count):
+    """
+    Splits a list in count chunks of about the same size.
+    """
+    size = -(-len(values) // count)
+    return [values[i:i + size] for i in range(0, len(values), size)]
+
+
+class Pool:
+    """
+    Process pool of workers warmed with the top level expressions of a
+    session that changed its global environment.
+
+    The workers are started at the first map. They are restarted when the
+    session has new such expressions, so they always know all procedures and
+    global bindings of the session.
+    """
+    def __init__(self, processes, exps, backend=None, optimize=False):
+        self.__processes = processes
+        self.__exps = exps
+        self.__backend = backend
+        self.__optimize = optimize
+        self.__pool = None
+        self.__warmed = 0
+
+    def close(self):
+        """
+        Stops the workers.
+        """
+        if self.__pool:
+            self.__pool.terminate()
+            self.__pool.join()
+            self.__pool = None
+
+    def map(self, name, values):
+        """
+        Applies the procedure bound to name on each value, returns the results
+        in order.
+        """
+        if not values:
+            return []
+        if self.__pool is None or self.__warmed != len(self.__exps):
+            self.close()
+            self.__warmed = len(self.__exps)
+            self.__pool = multiprocessing.Pool(self.__processes, _warm_worker,
+                                               (self.__exps[:], self.__backend,
+                                                self.__optimize))
+        chunks = _chunks(values, self.__processes * _CHUNKS_PER_PROCESS)
+        return [result for results in self.__pool.starmap(_apply_chunk,
+                                                          [(name, c) for c in chunks])
+                for result in results]
+
+
+def parallel_map_primitive(exps, pool=None):
+    """
+    Creates the parallel-map primitive of a session.
+
+    (parallel-map procedure list) applies the procedure on the elements of
+    the list. With a pool, the procedure must be bound to a global identifier
+    by one of the top level definitions in exps, the applications are
+    evaluated on the workers. Without a pool, they are evaluated in the
+    session.
+    """
+    def global_name(procedure, env):
+        """
+        Get the global identifier of a defined procedure.
+        """
+        for definition in reversed(exps):
+            if type(definition) is not expressions.Definition:
+                continue
+            try:
+                if env.global_frame[definition.identifier] is procedure:
+                    return definition.identifier
+            except environment.EnvError:
+                pass
+        raise apply.ApplyError("parallel-map: The procedure is not defined at top level.")
+
+    def parallel_map(args, env):
+        """
+        Applies a procedure on the elements of a list.
+        """
+        if len(args) != 2:
+            raise apply.ApplyError("parallel-map: Expected a procedure and a list.")
+        procedure, values = args
+        if not isinstance(procedure, procedures.Procedure) or \
+                not isinstance(values, basictypes.List):
+            raise apply.ApplyError("parallel-map: Expected a procedure and a list.")
+        if pool is None or type(procedure) is not procedures.Compound:
+            results = [trampoline.unpack(procedure.apply_values([value], env))
+                       for value in values]
+        else:
+            results = pool.map(global_name(procedure, env), values.value)
+        return basictypes.make_list(results)
+
+    return procedures.Primitive(parallel_map)
@@ -0,0 +1,278 @@
+"""
+Deterministic profiler of Scheme procedures.
+
+While the profiler is enabled, the applications of compound and primitive
+procedures, the forcing of thunks and the trampoline are replaced by timed
+versions, so a disabled profiler costs nothing. Expressions must be compiled
+by the closure backend after the profiler is enabled. The machine backend
+does not run the bodies of procedures on the trampoline, it is not supported.
+
+A compound procedure returns its body as a tail call, the body runs in the
+trampoline loop that unpacks it. The loop owns the profiled frame of the
+procedure, a tail call in the body replaces the frame like it replaces the
+call. Compound procedures are named by their definitions, primitives by their
+global identifiers, others are profiled as lambda.
+
+For each procedure the profiler counts the calls, the thunks forced in it,
+the inclusive time, with the procedures it calls, and the exclusive time,
+without them. Recursive calls are counted once in the inclusive time.
+"""
+import sys
+import time
+from schemepy.backend import procedures
+from schemepy.evalapply import evaluate, thunk, trampoline
+from schemepy import globalenvironment
+
+
+class _Frame:
+    """
+    Profiled frame of a procedure call.
+    """
+    __slots__ = ('name', 'start', 'children', 'path', 'pending')
+
+    def __init__(self, name):
+        self.name = name
+        self.start = None
+        self.children = 0.0
+        self.path = name
+        self.pending = True
+
+
+class Profiler:
+    """
+    Profiler of Scheme procedures.
+    """
+    def __init__(self):
+        self.__names = globalenvironment.names()
+        self.__stack = []
+        self.__active = {}
+        self.__stats = {}
+        self.__stacks = {}
+        self.__originals = None
+
+    def __enter__(self):
+        self.enable()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.disable()
+
+    def __name(self, procedure):
+        """
+        Get the name of a procedure.
+        """
+        name = getattr(procedure, 'name', None)
+        return name if name is not None else self.__names.get(procedure, "lambda")
+
+    def __stat(self, name):
+        """
+        Get the calls, the forces, the inclusive and the exclusive time of a
+        procedure.
+        """
+        stat = self.__stats.get(name)
+        if stat is None:
+            stat = self.__stats[name] = [0, 0, 0.0, 0.0]
+        return stat
+
+    def __push(self, procedure, pending):
+        """
+        Pushes the frame of a call, a pending frame waits for the trampoline
+        loop that runs the body.
+        """
+        frame = _Frame(self.__name(procedure))
+        self.__stack.append(frame)
+        if not pending:
+            self.__activate(frame)
+
+    def __activate(self, frame):
+        """
+        Starts a frame on top of the stack.
+        """
+        frame.pending = False
+        frame.start = time.perf_counter()
+        stack = self.__stack
+        if len(stack) > 1:
+            frame.path = stack[-2].path + ";" + frame.name
+        self.__stat(frame.name)[0] += 1
+        self.__active[frame.name] = self.__active.get(frame.name, 0) + 1
+
+    def __pop(self):
+        """
+        Ends the frame on top of the stack, a pending frame is dropped.
+        """
+        frame = self.__stack.pop()
+        if frame.pending:
+            return
+        elapsed = time.perf_counter() - frame.start
+        if self.__stack:
+            self.__stack[-1].children += elapsed
+        stat = self.__stat(frame.name)
+        active = self.__active[frame.name] - 1
+        self.__active[frame.name] = active
+        if not active:
+            stat[2] += elapsed
+        exclusive = elapsed - frame.children
+        stat[3] += exclusive
+        self.__stacks[frame.path] = self.__stacks.get(frame.path, 0.0) + exclusive
+
+    def enable(self):
+        """
+        Starts profiling.
+        """
+        if self.__originals is not None:
+            return
+        compound, primitive = procedures.Compound, procedures.Primitive
+        profiled = [
+            (compound, 'apply', self.__pending_call),
+            (compound, 'apply_values', self.__pending_call),
+            (compound, 'reapply_values', self.__pending_call),
+            (primitive, 'apply', self.__primitive_call),
+            (primitive, 'apply_values', self.__timed_call),
+            (thunk.Thunk, '__call__', self.__force),
+            (thunk.ThunkMemo, '__call__', self.__force),
+            (trampoline, 'unpack', self.__unpack),
+            ]
+        self.__originals = [(owner, attribute, getattr(owner, attribute))
+                            for owner, attribute, _ in profiled]
+        for owner, attribute, wrapper in profiled:
+            setattr(owner, attribute, wrapper(getattr(owner, attribute)))
+
+    def disable(self):
+        """
+        Stops profiling, the frames still on the stack are ended.
+        """
+        if self.__originals is None:
+            return
+        for owner, attribute, original in self.__originals:
+            setattr(owner, attribute, original)
+        self.__originals = None
+        while self.__stack:
+            self.__pop()
+
+    def __pending_call(self, original):
+        """
+        Profiles the application of a compound procedure, the frame of the
+        call waits for the body.
+        """
+        push = self.__push
+
+        def pending_call(procedure, arguments, env):
+            """
+            Applies a compound procedure.
+            """
+            result = original(procedure, arguments, env)
+            push(procedure, True)
+            return result
+        return pending_call
+
+    def __timed_call(self, original):
+        """
+        Profiles the application of a primitive procedure.
+        """
+        stack, push, pop = self.__stack, self.__push, self.__pop
+
+        def timed_call(procedure, arguments, env):
+            """
+            Applies a primitive procedure.
+
+            A primitive that returns the tail call of a compound procedure,
+            apply, leaves the pending frame of the call on the stack.
+            """
+            push(procedure, False)
+            try:
+                return original(procedure, arguments, env)
+            finally:
+                pending = stack.pop() if stack[-1].pending else None
+                pop()
+                if pending:
+                    stack.append(pending)
+        return timed_call
+
+    @staticmethod
+    def __primitive_call(original):
+        """
+        Profiles the application of a primitive procedure on expressions, the
+        arguments are evaluated in the frame of the caller.
+        """
+        force_evaluate = evaluate.force_evaluate
+
+        def primitive_call(procedure, arguments, env):
+            """
+            Applies a primitive procedure.
+            """
+            return procedure.apply_values([force_evaluate(a, env) for a in arguments], env)
+        return primitive_call
+
+    def __force(self, original):
+        """
+        Profiles the forcing of a thunk, a memo thunk is counted when it is
+        evaluated.
+        """
+        stat, stack = self.__stat, self.__stack
+        memo = original is thunk.ThunkMemo.__call__
+
+        def force(promise):
+            """
+            Forces a thunk.
+            """
+            if stack and (not memo or promise._func is not None):
+                stat(stack[-1].name)[1] += 1
+            return original(promise)
+        return force
+
+    def __unpack(self, original):
+        """
+        Profiles the trampoline.
+        """
+        stack, activate, pop = self.__stack, self.__activate, self.__pop
+        tail_call, thunk_type = trampoline._TAIL_CALL, thunk.Thunk
+
+        def unpack(obj):
+            """
+            Performs tail calls and the function calls of thunks, the frame of
+            a call made in the loop is owned by the loop.
+            """
+            mark = len(stack)
+            if mark and stack[-1].pending:
+                mark -= 1
+                activate(stack[-1])
+            try:
+                while True:
+                    if obj is tail_call:
+                        obj = tail_call.func(tail_call.first, tail_call.second)
+                    elif isinstance(obj, thunk_type):
+                        obj = obj()
+                    else:
+                        return obj
+                    if len(stack) > mark and stack[-1].pending:
+                        frame = stack.pop()
+                        while len(stack) > mark:
+                            pop()
+                        stack.append(frame)
+                        activate(frame)
+            finally:
+                while len(stack) > mark:
+                    pop()
+        return unpack
+
+    def report(self, stream=sys.stderr):
+        """
+        Writes the profile table sorted by exclusive time.
+        """
+        stream.write("{:>10}{:>10}{:>14}{:>14}  {}\n".format("calls", "forces", "inclusive",
+                                                            "exclusive", "procedure"))
+        for name, (calls, forces, inclusive, exclusive) in sorted(
+                self.__stats.items(), key=lambda item: item[1][3], reverse=True):
+            stream.write("{:>10}{:>10}{:>13.6f}s{:>13.6f}s  {}\n".format(calls, forces, inclusive,
+                                                                        exclusive, name))
+
+    def write_stacks(self, path):
+        """
+        Writes the exclusive time of each call stack in microseconds, in the
+        collapsed stack format of flame graph tools.
+        """
+        with open(path, "w") as stream:
+            for stack, exclusive in sorted(self.__stacks.items()):
+                microseconds = round(exclusive * 1e6)
+                if microseconds:
+                    stream.write("{} {}\n".format(stack, microseconds))
@@ -2,15 +2,19 @@
 Read-eval-print loop.
 """
 import logging
-import sys
-from schemepy.evalapply import evaluate, apply
+from schemepy.evalapply import apply, budget, evaluate
 from schemepy.frontend import inout, syntaxerror
-from schemepy import environment, globalenvironment
+from schemepy import environment, interpreter
 
 
-def repl():
+def repl(backend=None, optimize=False, processes=None, fuel=None, timeout=None):
     """
     Read-eval-print loop.
+
+    Each expression is optimized if optimize is true, and the backend, if
+    given, compiles it before it is evaluated. parallel-map uses processes
+    worker processes. Each expression may take at most fuel steps and timeout
+    seconds.
     """
     def get_input():
         """
@@ -20,7 +24,8 @@ def repl():
             yield input("> ")
 
     print("Welcome to SchemePy!")
-    env = globalenvironment.create()
+    session = interpreter.Interpreter(backend=backend, optimize=optimize, processes=processes,
+                                      fuel=fuel, timeout=timeout)
     reader = inout.read(get_input())
     while True:
         try:
@@ -30,12 +35,13 @@ def repl():
             continue
         logging.debug("Expression: %s", exp)
         try:
-            evaluated_exp = evaluate.force_evaluate(exp, env)
-        except environment.EnvError as error:
+            evaluated_exp = session.evaluate(exp)
+        except (environment.EnvError, evaluate.EvalError, apply.ApplyError,
+                budget.ResourceExhausted) as error:
             print(error)
             continue
-        except (evaluate.EvalError, apply.ApplyError) as error:
-            print(error)
-            sys.exit(-1)
-        logging.debug("Environment:\n%s", env)
+        except RecursionError:
+            print("maximum recursion depth exceeded")
+            continue
+        logging.debug("Environment:\n%s", session.environment)
         print(inout.disp(evaluated_exp))
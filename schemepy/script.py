@@ -0,0 +1,90 @@
+"""
+Script execution, evaluates a program without interaction.
+"""
+import logging
+import sys
+from schemepy.evalapply import apply, budget, evaluate
+from schemepy.frontend import cache, inout, syntaxerror
+from schemepy import environment, interpreter
+
+
+_CHUNK_SIZE = 1 << 16
+
+
+def _chunks(stream):
+    """
+    Reads a text stream in large chunks of whole lines.
+    """
+    while True:
+        chunk = stream.read(_CHUNK_SIZE)
+        if not chunk:
+            return
+        if not chunk.endswith("\n"):
+            chunk += stream.readline()
+        yield chunk
+
+
+def _run(reader, backend, optimize, processes, fuel, timeout):
+    """
+    Evaluates all expressions of a reader, returns the exit status.
+    """
+    with interpreter.Interpreter(backend=backend, optimize=optimize, processes=processes,
+                                 fuel=fuel, timeout=timeout) as session:
+        return _run_session(reader, session)
+
+
+def _run_session(reader, session):
+    """
+    Evaluates all expressions of a reader in a session, returns the exit
+    status.
+    """
+    while True:
+        try:
+            exp = reader()
+        except StopIteration:
+            return 0
+        except syntaxerror.SchemeSyntaxError as error:
+            print("Syntax error: {}".format(error), file=sys.stderr)
+            return 1
+        logging.debug("Expression: %s", exp)
+        try:
+            session.evaluate(exp)
+        except (environment.EnvError, evaluate.EvalError, apply.ApplyError,
+                budget.ResourceExhausted) as error:
+            print(error, file=sys.stderr)
+            return 1
+        except RecursionError:
+            print("maximum recursion depth exceeded", file=sys.stderr)
+            return 1
+
+
+def run(stream, backend=None, optimize=False, processes=None, fuel=None, timeout=None):
+    """
+    Evaluates all expressions of a stream, returns the exit status.
+
+    The values of the expressions are not printed. The first error stops the
+    execution. Each expression is optimized if optimize is true, and the
+    backend, if given, compiles it before it is evaluated. parallel-map uses
+    processes worker processes. Each expression may take at most fuel steps
+    and timeout seconds.
+    """
+    return _run(inout.read(_chunks(stream)), backend, optimize, processes, fuel, timeout)
+
+
+def run_file(path, backend=None, optimize=False, use_cache=True, processes=None, fuel=None,
+             timeout=None):
+    """
+    Evaluates all expressions of a source file, returns the exit status.
+
+    The parsed expressions are loaded from the cache of the file if it is
+    valid, and cached otherwise. A file with a syntax error is not cached, it
+    is run up to the error. The cache holds the expressions before they are
+    optimized.
+    """
+    if use_cache:
+        expressions = cache.load(path)
+        if expressions is not None:
+            return _run(iter(expressions).__next__, backend, optimize, processes, fuel,
+                        timeout)
+    with open(path) as stream:
+        return run(stream, backend, optimize, processes, fuel, timeout)
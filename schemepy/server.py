@@ -0,0 +1,140 @@
+"""
+Interpreter server, many clients share one warm interpreter process.
+
+The server listens on a TCP address (host:port) or on a Unix socket (a path).
+Each connection is an isolated session, an overlay of a frozen base
+environment with the prelude, so a session is created in O(1) and the
+prelude is evaluated once. The protocol is the REPL's: the client sends
+lines of source, the server answers each complete input with the output and
+the values of its expressions followed by a "> " prompt.
+
+The connections are handled by an asyncio event loop, the evaluations run on
+a pool of threads so that the loop keeps serving the other clients. The
+evaluations themselves are serialized by the evaluation lock, see evaluate,
+the server evaluates one input at a time. An input may take TIMEOUT seconds
+by default, so a runaway loop of a client does not block the others.
+"""
+import asyncio
+import concurrent.futures
+import contextlib
+import io
+from schemepy.evalapply import apply, budget, evaluate
+from schemepy.frontend import inout, syntaxerror
+from schemepy import environment, interpreter
+
+
+_PROMPT = "> "
+
+TIMEOUT = 10.0
+
+
+def _evaluate_input(session, source):
+    """
+    Evaluates a complete input in a session, returns the response.
+
+    The output of display is captured while the evaluation lock is held, no
+    other evaluation can write to it.
+    """
+    output = io.StringIO()
+    with evaluate.LOCK, contextlib.redirect_stdout(output):
+        try:
+            for exp in session.parse(source):
+                print(inout.disp(session.evaluate(exp)))
+        except syntaxerror.SchemeSyntaxError as error:
+            print("Syntax error: {}".format(error))
+        except (environment.EnvError, evaluate.EvalError, apply.ApplyError,
+                budget.ResourceExhausted) as error:
+            print(error)
+        except Exception as error:  # A client must not stop the server.
+            print("Error: {}".format(error))
+    return output.getvalue()
+
+
+def _complete(source):
+    """
+    Checks if a source ends outside of an expression.
+    """
+    reader = inout.read(iter([source]), lexical_addressing=False)
+    try:
+        while True:
+            reader()
+    except StopIteration:
+        return True
+    except syntaxerror.IncompleteInputError:
+        return False
+    except syntaxerror.SchemeSyntaxError:
+        return True
+
+
+class Server:
+    """
+    Interpreter server.
+
+    The prelude sources are evaluated in the base environment, which is then
+    frozen. Each input of a client may take at most fuel steps and timeout
+    seconds, so a runaway loop does not hold the evaluation lock. A timeout
+    of None is unlimited.
+    """
+    def __init__(self, prelude=(), backend=None, optimize=False, threads=None, fuel=None,
+                 timeout=TIMEOUT):
+        base = interpreter.Interpreter(backend=backend, optimize=optimize)
+        for source in prelude:
+            base.eval_string(source)
+        base.environment.freeze()
+        self.__base = base.environment
+        self.__backend = backend
+        self.__optimize = optimize
+        self.__fuel = fuel
+        self.__timeout = timeout
+        self.__executor = concurrent.futures.ThreadPoolExecutor(threads)
+
+    async def __serve_client(self, reader, writer):
+        """
+        Serves a connection.
+        """
+        loop = asyncio.get_running_loop()
+        session = interpreter.Interpreter(self.__base, self.__backend, self.__optimize,
+                                          fuel=self.__fuel, timeout=self.__timeout)
+        writer.write(("Welcome to SchemePy!\n" + _PROMPT).encode())
+        source = ""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                source += line.decode(errors="replace")
+                if _complete(source):
+                    response = await loop.run_in_executor(self.__executor, _evaluate_input,
+                                                          session, source)
+                    writer.write(response.encode())
+                    source = ""
+                writer.write(_PROMPT.encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            session.close()
+            writer.close()
+
+    async def serve(self, address):
+        """
+        Serves clients on an address until the task is cancelled.
+        """
+        if "/" in address:
+            server = await asyncio.start_unix_server(self.__serve_client, address)
+        else:
+            host, _, port = address.rpartition(":")
+            server = await asyncio.start_server(self.__serve_client, host or None, int(port))
+        async with server:
+            await server.serve_forever()
+
+
+def serve(address, prelude=(), backend=None, optimize=False, threads=None, fuel=None,
+          timeout=TIMEOUT):
+    """
+    Runs an interpreter server on an address, host:port or a Unix socket path.
+    """
+    try:
+        asyncio.run(Server(prelude, backend, optimize, threads, fuel, timeout).serve(address))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,173 @@
+"""
+Runtime statistics, counters of the evaluation.
+
+The counters are collected in the process while they are enabled:
+
+    evaluated          expressions evaluated, by expression type
+    bounces            tail calls bounced on the trampoline
+    frames             environment frames created
+    frames_reused      frames of self tail calls reused
+    thunks_created     thunks created
+    thunks_forced      thunks evaluated when forced
+    memo_hits          memo thunks forced again, answered by the memo
+    primitives         primitive procedure calls, by global identifier
+
+Enabling the counters replaces the evaluate methods of the expression types,
+bounce, the environment frame constructors, the thunk methods and the
+primitive applications by counting versions, so disabled counters cost
+nothing. The closure backend evaluates a compiled expression as one Compiled
+expression, the expressions inside it are not counted, and the machine
+backend as one Machine expression. The machine forces the thunks of its
+expressions without calling them, they are not counted.
+"""
+from schemepy.backend import expressions, procedures
+from schemepy.evalapply import thunk, trampoline
+from schemepy import environment
+
+
+_COUNTERS = ('bounces', 'frames', 'frames_reused', 'thunks_created', 'thunks_forced',
+             'memo_hits')
+
+_counts = dict.fromkeys(_COUNTERS, 0)
+_evaluated = {}
+_primitives = {}
+_originals = None
+
+
+def _expression_types(base=expressions.Expression):
+    """
+    Get the expression types that define an evaluate method.
+    """
+    for subclass in base.__subclasses__():
+        if 'evaluate' in vars(subclass):
+            yield subclass
+        yield from _expression_types(subclass)
+
+
+def _counted_evaluate(original):
+    """
+    Counts the evaluations of an expression type.
+    """
+    evaluated = _evaluated
+
+    def evaluate(exp, env):
+        """
+        Evaluates an expression.
+        """
+        exp_type = type(exp)
+        evaluated[exp_type] = evaluated.get(exp_type, 0) + 1
+        return original(exp, env)
+    return evaluate
+
+
+def _counted(original, counter):
+    """
+    Counts the calls of a function.
+    """
+    counts = _counts
+
+    def counted(*args):
+        """
+        Calls the function.
+        """
+        counts[counter] += 1
+        return original(*args)
+    return counted
+
+
+def _counted_force(original):
+    """
+    Counts the forcing of a thunk, a memo thunk that was forced before is a
+    memo hit.
+    """
+    counts = _counts
+    memo = original is thunk.ThunkMemo.__call__
+
+    def force(promise):
+        """
+        Forces a thunk.
+        """
+        counts['memo_hits' if memo and promise._func is None else 'thunks_forced'] += 1
+        return original(promise)
+    return force
+
+
+def _counted_primitive(original):
+    """
+    Counts the calls of primitive procedures by global identifier.
+    """
+    from schemepy import globalenvironment
+    names, primitives = globalenvironment.names(), _primitives
+
+    def primitive(procedure, arguments, env):
+        """
+        Applies a primitive procedure.
+        """
+        name = names.get(procedure, "primitive")
+        primitives[name] = primitives.get(name, 0) + 1
+        return original(procedure, arguments, env)
+    return primitive
+
+
+def enabled():
+    """
+    Checks if the counters are enabled.
+    """
+    return _originals is not None
+
+
+def enable():
+    """
+    Starts counting.
+    """
+    global _originals
+    if _originals is not None:
+        return
+    frame, primitive = environment.Environment, procedures.Primitive
+    counted = [(exp_type, 'evaluate', _counted_evaluate) for exp_type in _expression_types()]
+    counted += [
+        (trampoline, 'bounce', lambda original: _counted(original, 'bounces')),
+        (frame, 'extend', lambda original: _counted(original, 'frames')),
+        (frame, 'extend_frame', lambda original: _counted(original, 'frames')),
+        (frame, 'rebind', lambda original: _counted(original, 'frames_reused')),
+        (thunk.Thunk, '__init__', lambda original: _counted(original, 'thunks_created')),
+        (thunk.Thunk, '__call__', _counted_force),
+        (thunk.ThunkMemo, '__call__', _counted_force),
+        (primitive, 'apply', _counted_primitive),
+        (primitive, 'apply_values', _counted_primitive),
+        ]
+    _originals = [(owner, attribute, vars(owner)[attribute]) for owner, attribute, _ in counted]
+    for owner, attribute, counter in counted:
+        setattr(owner, attribute, counter(vars(owner)[attribute]))
+
+
+def disable():
+    """
+    Stops counting, the counts are kept.
+    """
+    global _originals
+    if _originals is None:
+        return
+    for owner, attribute, original in _originals:
+        setattr(owner, attribute, original)
+    _originals = None
+
+
+def reset():
+    """
+    Sets all counts to zero.
+    """
+    for counter in _COUNTERS:
+        _counts[counter] = 0
+    _evaluated.clear()
+    _primitives.clear()
+
+
+def snapshot():
+    """
+    Get a copy of the counts.
+    """
+    counts = dict(_counts)
+    counts['evaluated'] = {exp_type.__name__: count for exp_type, count in _evaluated.items()}
+    counts['primitives'] = dict(_primitives)
+    return counts
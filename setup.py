@@ -3,10 +3,11 @@
 Scheme interpreter setup.
 """
 from setuptools import setup
+from schemepy import __version__
 
 
 setup(name='SchemePy',
-      version='1.0.0',
+      version=__version__,
       description='Scheme interpreter',
       packages=['schemepy', 'schemepy.backend', 'schemepy.evalapply', 'schemepy.frontend'],
       entry_points={'console_scripts': ['schemepy = schemepy.__main__:main']},